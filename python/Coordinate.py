@@ -1,19 +1,18 @@
 class Coordinate():
-    def __init__(latitude, longitude):
-        self.latitude = latitude
-        self.longitude = longitude
+    def __init__(self, latitude: float, longitude: float):
+        self.lat = latitude
+        self.long = longitude
 
-    def setLatitude(latitude: float):
-        self.latitude = latitude
+    def setLatitude(self, latitude: float):
+        self.lat = latitude
 
-    def setLongitude(longitude: float):
-        self.longitude = longitude
+    def setLongitude(self, longitude: float):
+        self.long = longitude
 
 
-    def latitude():
-        return self.latitude
+    def latitude(self):
+        return self.lat
 
 
-    def longitude():
-        return self.longitude
-
+    def longitude(self):
+        return self.long
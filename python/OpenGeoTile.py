@@ -1,6 +1,7 @@
 from openlocationcode import openlocationcode as olc
+from collections import OrderedDict
 from enum import Enum
-import math, re
+import itertools, math, threading
 
 class TileSize(Enum):
     ''' An area of 20° x 20°. The side length of this tile varies with its location on the globe,
@@ -50,17 +51,13 @@ PADDING_4 = "0000"
 PADDING_6 = "000000"
 CODE_ALPHABET = olc.CODE_ALPHABET_
 BASE_20_SET = {x+y for x in CODE_ALPHABET for y in CODE_ALPHABET}
+''' the same character pairs, in ascending order '''
+BASE_20_LIST = [x+y for x in CODE_ALPHABET for y in CODE_ALPHABET]
 BASE_20_BORDER_SET = {x for x in BASE_20_SET if x[0] in ['2', 'X'] or x[1] in ['2', 'X']}
 NORTH_DIGITS = {x for x in BASE_20_BORDER_SET if x[0] == 'X'}
 EAST_DIGITS = {x for x in BASE_20_BORDER_SET if x[1] == 'X'}
 SOUTH_DIGITS = {x for x in BASE_20_BORDER_SET if x[0] == '2'}
 WEST_DIGITS = {x for x in BASE_20_BORDER_SET if x[1] == '2'}
-memoized_digit_dict = {
-    "N1": NORTH_DIGITS,
-    "E1": EAST_DIGITS,
-    "S1": SOUTH_DIGITS,
-    "W1": WEST_DIGITS,
-}
 
 
 def is_padded(plus_code):
@@ -90,6 +87,238 @@ def return_set_of_subaddresses(set_of_addresses):
             return None
     return {address+base for address in set_of_addresses for base in BASE_20_SET}
 
+''' packed tile ids:
+    the lowest 3 bits hold the tile level (code length / 2, so 1..5), the 50 bits above hold the
+    10 address characters as 5-bit alphabet indices, most significant character first.
+    Characters beyond the tile's code length are zero, so every descendant of a tile shares the
+    upper bits of that tile's id, and sorting ids sorts tiles by address, parents first. '''
+TILE_ID_LEVEL_BITS = 3
+TILE_ID_DIGIT_BITS = 5
+TILE_ID_LEVEL_MASK = (1 << TILE_ID_LEVEL_BITS) - 1
+TILE_ID_DIGIT_MASK = (1 << TILE_ID_DIGIT_BITS) - 1
+CODE_ALPHABET_INDEX = {character: index for index, character in enumerate(CODE_ALPHABET)}
+TILE_SIZE_BY_CODE_LENGTH = {tile_size.getCodeLength(): tile_size for tile_size in TileSize}
+
+def return_code_of_tile_address(tile_address):
+    ''' full plus code of a tile address, e.g. "CVXW" -> "CVXW0000+" '''
+    if len(tile_address) not in TILE_SIZE_BY_CODE_LENGTH:
+        raise Exception("Invalid tile address")
+    tile_address = tile_address.upper()
+    if len(tile_address) == TileSize.PINPOINT.getCodeLength():
+        return tile_address[:-2] + SEPARATOR + tile_address[-2:]
+    padded_address = tile_address + PADDING_CHARACTER * (TileSize.NEIGHBORHOOD.getCodeLength() - len(tile_address))
+    return padded_address + SEPARATOR
+
+def return_tile_id_of_address(tile_address):
+    if len(tile_address) not in TILE_SIZE_BY_CODE_LENGTH:
+        raise Exception("Invalid tile address")
+    tile_id = 0
+    for character in tile_address.upper():
+        index = CODE_ALPHABET_INDEX.get(character)
+        if index is None:
+            raise Exception("Character does not exist in alphabet")
+        tile_id = (tile_id << TILE_ID_DIGIT_BITS) | index
+    unused_characters = TileSize.PINPOINT.getCodeLength() - len(tile_address)
+    tile_id <<= TILE_ID_DIGIT_BITS * unused_characters
+    return (tile_id << TILE_ID_LEVEL_BITS) | (len(tile_address) // 2)
+
+def return_code_length_of_tile_id(tile_id):
+    code_length = 2 * (tile_id & TILE_ID_LEVEL_MASK)
+    if code_length not in TILE_SIZE_BY_CODE_LENGTH:
+        raise Exception("Invalid tile id")
+    return code_length
+
+def return_address_of_tile_id(tile_id):
+    code_length = return_code_length_of_tile_id(tile_id)
+    digits = tile_id >> TILE_ID_LEVEL_BITS
+    full_length = TileSize.PINPOINT.getCodeLength()
+    return ''.join(
+        CODE_ALPHABET[(digits >> (TILE_ID_DIGIT_BITS * (full_length - 1 - i))) & TILE_ID_DIGIT_MASK]
+        for i in range(code_length)
+    )
+
+def return_tile_id_prefix_shift(code_length):
+    ''' right shift that leaves only the address characters of a tile of code_length '''
+    return TILE_ID_LEVEL_BITS + TILE_ID_DIGIT_BITS * (TileSize.PINPOINT.getCodeLength() - code_length)
+
+def return_parent_tile_id(tile_id):
+    ''' id of the next biggest tile at this location; None for GLOBAL tiles '''
+    code_length = return_code_length_of_tile_id(tile_id)
+    if code_length == TileSize.GLOBAL.getCodeLength():
+        return None
+    parent_shift = return_tile_id_prefix_shift(code_length - 2)
+    return ((tile_id >> parent_shift) << parent_shift) | (code_length // 2 - 1)
+
+def tile_id_contains(tile_id, potential_member_id):
+    ''' integer equivalent of OpenGeoTile.contains() '''
+    code_length = return_code_length_of_tile_id(tile_id)
+    if return_code_length_of_tile_id(potential_member_id) < code_length:
+        return False
+    prefix_shift = return_tile_id_prefix_shift(code_length)
+    return (tile_id >> prefix_shift) == (potential_member_id >> prefix_shift)
+
+''' character pairs of the subtiles along each side of a tile, in ascending order, and of the
+    subtiles in its corners; the border subtiles at any depth are combinations of these '''
+BORDER_PAIRS = {
+    'N': [x for x in BASE_20_LIST if x[0] == 'X'],
+    'E': [x for x in BASE_20_LIST if x[1] == 'X'],
+    'S': [x for x in BASE_20_LIST if x[0] == '2'],
+    'W': [x for x in BASE_20_LIST if x[1] == '2'],
+    'NW': ['X2'],
+    'NE': ['XX'],
+    'SE': ['2X'],
+    'SW': ['22'],
+}
+
+def iterate_border_suffixes(eight_point_direction, depth):
+    '''
+    Lazily yield the address suffixes (2 * depth characters) of the subtiles along one side or
+    in one corner of a tile: a subtile on the north side of a tile lies on the north side of its
+    parent, and so on, down to depth.
+    '''
+    border_pairs = BORDER_PAIRS.get(eight_point_direction)
+    if border_pairs is None:
+        raise Exception("eight_point_direction must be one of N, E, S, W, NW, NE, SE, SW")
+    for pairs in itertools.product(border_pairs, repeat=depth):
+        yield ''.join(pairs)
+
+ENCODING_BASE = len(CODE_ALPHABET)
+''' the first latitude character only spans 180°/20° = 9, the first longitude character
+    360°/20° = 18 values of the alphabet '''
+LATITUDE_FIRST_DIGIT_COUNT = 9
+LONGITUDE_FIRST_DIGIT_COUNT = 18
+
+def return_grid_dimensions(tile_size):
+    ''' number of (rows, columns) of tiles of tile_size covering the globe '''
+    scale = ENCODING_BASE ** (tile_size.getCodeLength() // 2 - 1)
+    return LATITUDE_FIRST_DIGIT_COUNT * scale, LONGITUDE_FIRST_DIGIT_COUNT * scale
+
+def return_grid_coordinates_of_address(tile_address):
+    '''
+    Position of a tile in the grid of all tiles of the same size: row 0 is the southernmost row
+    (starting at 90°S), column 0 the westernmost column (starting at 180°W).
+    @return a (row, column) tuple of ints
+    '''
+    row = 0
+    column = 0
+    for i in range(0, len(tile_address), 2):
+        row = row * ENCODING_BASE + CODE_ALPHABET_INDEX[tile_address[i].upper()]
+        column = column * ENCODING_BASE + CODE_ALPHABET_INDEX[tile_address[i + 1].upper()]
+    return row, column
+
+def return_address_of_grid_coordinates(row, column, tile_size):
+    ''' inverse of return_grid_coordinates_of_address(); columns wrap around the globe '''
+    grid_rows, grid_columns = return_grid_dimensions(tile_size)
+    if not 0 <= row < grid_rows:
+        raise Exception("Row out of range")
+    column %= grid_columns
+    characters = []
+    for i in range(tile_size.getCodeLength() // 2):
+        row, row_digit = divmod(row, ENCODING_BASE)
+        column, column_digit = divmod(column, ENCODING_BASE)
+        characters.append(CODE_ALPHABET[row_digit] + CODE_ALPHABET[column_digit])
+    return ''.join(reversed(characters))
+
+def return_wrapped_column_difference(column, other_column, tile_size):
+    ''' signed number of columns from column to other_column, going the shorter way around '''
+    grid_columns = return_grid_dimensions(tile_size)[1]
+    column_difference = (other_column - column) % grid_columns
+    if column_difference > grid_columns // 2:
+        column_difference -= grid_columns
+    return column_difference
+
+def return_column_offset_ranges(inner_distance, outer_distance, lowest_offset, highest_offset):
+    ''' ranges of column offsets with inner_distance <= abs(offset) <= outer_distance, west to east '''
+    if inner_distance > outer_distance:
+        return []
+    if inner_distance == 0:
+        return [range(max(lowest_offset, -outer_distance), min(highest_offset, outer_distance) + 1)]
+    return [range(max(lowest_offset, -outer_distance), -inner_distance + 1),
+            range(inner_distance, min(highest_offset, outer_distance) + 1)]
+
+def iterate_grid_coordinates_at_distance(row, column, tile_size, min_distance, max_distance, manhattan=False):
+    '''
+    Lazily yield the grid coordinates of all tiles of tile_size whose Chebyshev (or Manhattan)
+    distance to the tile at (row, column) is between min_distance and max_distance, south to north
+    and west to east. Rows beyond the poles are clipped; columns wrap around the globe and are
+    measured the shorter way around, so that every tile is yielded at most once.
+    '''
+    grid_rows, grid_columns = return_grid_dimensions(tile_size)
+    ''' each column once, at its smallest offset from column '''
+    lowest_offset = -min(max_distance, (grid_columns - 1) // 2)
+    highest_offset = min(max_distance, grid_columns // 2)
+    for row_offset in range(-max_distance, max_distance + 1):
+        other_row = row + row_offset
+        if not 0 <= other_row < grid_rows:
+            continue
+        if manhattan:
+            inner_distance = max(0, min_distance - abs(row_offset))
+            outer_distance = max_distance - abs(row_offset)
+        else:
+            inner_distance = 0 if abs(row_offset) >= min_distance else min_distance
+            outer_distance = max_distance
+        for offsets in return_column_offset_ranges(inner_distance, outer_distance, lowest_offset, highest_offset):
+            for column_offset in offsets:
+                yield other_row, (column + column_offset) % grid_columns
+
+'''EIGHT_POINT_DIRECTIONS included to keep ordered data'''
+EIGHT_POINT_DIRECTIONS = ["NW", "N", "NE", "E", "SE", "S", "SW", "W"]
+EIGHT_POINT_DIRECTION_DELTAS = {
+    "NW": (+1, -1), "N": (+1, 0),   "NE": (+1, +1),
+     "W": ( 0, -1),                  "E": ( 0, +1),
+    "SW": (-1, -1), "S": (-1, 0),   "SE": (-1, +1),
+}
+
+def return_eight_point_directions(eight_point_direction=None):
+    ''' normalizes None, a single direction string or a list of directions to an ordered list '''
+    if not type(eight_point_direction) in [type(None), list, str]:
+        raise Exception("eight_point_direction must be of type list or str")
+    if eight_point_direction is None:
+        return EIGHT_POINT_DIRECTIONS
+    elif isinstance(eight_point_direction, str):
+        if eight_point_direction.upper() in EIGHT_POINT_DIRECTIONS:
+            return [eight_point_direction.upper()]
+        return []
+    else:
+        ''' this list construction keeps directions in the order above '''
+        uppercase_input_directions = [d.upper() for d in eight_point_direction]
+        return [direction for direction in EIGHT_POINT_DIRECTIONS if direction in uppercase_input_directions]
+
+def return_shifted_address(tile_address, lat_diff, long_diff):
+    '''
+    Address of the tile of the same size lat_diff tiles north and long_diff tiles east of
+    tile_address, computed by base-20 carry/borrow on the address characters. Longitude wraps at
+    the antimeridian.
+    @return the shifted tile address, or None if the shift would cross one of the poles
+    '''
+    digits = [CODE_ALPHABET_INDEX[character] for character in tile_address.upper()]
+    for first_position, diff in ((0, lat_diff), (1, long_diff)):
+        ''' latitude characters are at even, longitude characters at odd positions '''
+        position = len(digits) - 2 + first_position
+        while diff and position > first_position:
+            diff, digits[position] = divmod(digits[position] + diff, ENCODING_BASE)
+            position -= 2
+        if diff:
+            first_digit = digits[first_position] + diff
+            if first_position == 0:
+                if not 0 <= first_digit < LATITUDE_FIRST_DIGIT_COUNT:
+                    return None
+            else:
+                first_digit %= LONGITUDE_FIRST_DIGIT_COUNT
+            digits[first_position] = first_digit
+    return ''.join(CODE_ALPHABET[digit] for digit in digits)
+
+def return_neighbor_addresses(tile_address, eight_point_direction=None):
+    ''' addresses of the (up to 8) same-sized neighbors of tile_address, see OpenGeoTile.getNeighbors() '''
+    neighbor_addresses = set()
+    for direction in return_eight_point_directions(eight_point_direction):
+        lat_diff, long_diff = EIGHT_POINT_DIRECTION_DELTAS[direction]
+        neighbor_address = return_shifted_address(tile_address, lat_diff, long_diff)
+        if neighbor_address is not None:
+            '''//don't add tiles beyond the poles'''
+            neighbor_addresses.add(neighbor_address)
+    return neighbor_addresses
+
 class OpenGeoTile():
     '''
     /**
@@ -126,6 +355,34 @@ class OpenGeoTile():
             else:
                 self.constructTileFromCode(code)
         self.tile_address = self.code.replace(SEPARATOR, "")[0: self.tile_size.getCodeLength()]
+        self.grid_coordinates = None
+
+    def __eq__(self, other):
+        '''
+        Two OpenGeoTiles are equal if they describe the same area, see {@link #isSameTile}.
+        '''
+        if not isinstance(other, OpenGeoTile):
+            return NotImplemented
+        return self.tile_size == other.tile_size and self.tile_address == other.tile_address
+
+    def __setattr__(self, name, value):
+        ''' tiles shared through the tile cache are read-only, see {@link #freeze} '''
+        if self.__dict__.get('frozen') and name != 'grid_coordinates':
+            raise AttributeError("Shared OpenGeoTile from the tile cache must not be modified")
+        object.__setattr__(self, name, value)
+
+    def freeze(self):
+        '''
+        Make this tile read-only; only the lazily computed grid coordinates may still be filled in.
+        @return this tile
+        '''
+        self.frozen = True
+        return self
+
+    def __hash__(self):
+        ''' the address alone determines the tile size; not stored, as str hashes differ between
+            processes and tiles get pickled to worker processes '''
+        return hash(self.tile_address)
 
 
     def constructTileFromCode(self, plus_code):
@@ -287,58 +544,64 @@ class OpenGeoTile():
         */'''
         return self.getWrappedOpenLocationCode()
 
+    def getTileId(self):
+        '''
+        The packed integer id of this tile, see {@link PackedTile}.
+        @return an int encoding this tile's size and address
+        '''
+        return return_tile_id_of_address(self.getTileAddress())
+
+    def getGridCoordinates(self):
+        '''
+        The position of this tile in the grid of all tiles of its size, see
+        {@link return_grid_coordinates_of_address}. Computed once and cached.
+        @return a (row, column) tuple of ints
+        '''
+        if self.grid_coordinates is None:
+            self.grid_coordinates = return_grid_coordinates_of_address(self.getTileAddress())
+        return self.grid_coordinates
+
     def getNeighbors(self, eight_point_direction=None):
         '''/**
         * Get an array of the typically 8  neighboring tiles of the same size.
         * @return an array of the typically 8 neighboring tiles of the same size;
         * may return less than 8 neighbors for tiles near the poles.
         */'''
+        return {return_tile_of_address(address) for address in self.getNeighborAddresses(eight_point_direction)}
 
-        # deltas = [20.0, 1.0, 0.05, 0.0025, 0.000125]
-        delta = self.getTileSize().getCoordinateIncrement()
-
-        code_area = olc.decode(self.code)
-        latitude = code_area.latitudeCenter
-        longitude = code_area.longitudeCenter
-
-        '''directions_list included to keep ordered data'''
-        directions_list = ["NW", "N", "NE", "E", "SE", "S", "SW", "W"]
-        direction_dict = {
-            "NW": [+1, -1], "N": [+1, 0],   "NE": [+1, +1],
-             "W": [ 0, -1],                  "E": [ 0, +1],
-            "SW": [-1, -1], "S": [-1, 0],   "SE": [-1, +1],
-        }
-
-        #lat_diff =  [+1, +1, +1,  0, -1, -1, -1,  0]
-        #long_diff = [-1,  0, +1, +1, +1,  0, -1, -1]
-
-        if not type(eight_point_direction) in [type(None), list, str]:
-            raise Exception("eight_point_direction must be of type list or str")
-        if eight_point_direction is None:
-            directions = directions_list
-        elif isinstance(eight_point_direction, str):
-            directions = []
-            if eight_point_direction.upper() in directions_list:
-                directions.append(eight_point_direction.upper())
-        else:
-            ''' this list construction keeps directions in the order above '''
-            uppercase_input_directions = [d.upper() for d in eight_point_direction]
-            directions = [direction for direction in directions_list if direction in uppercase_input_directions]
-
-        neighbors = set()
-        for direction in directions:
-            lat_diff, long_diff = direction_dict.get(direction)
-            ''' //OLC constructor clips and normalizes,
-                //so we don't have to deal with invalid lat/long values directly'''
-            neighborLatitude  = latitude  + (delta * lat_diff)
-            neighborLongitude = longitude + (delta * long_diff)
+    def getNeighborAddresses(self, eight_point_direction=None):
+        '''
+        Get the tile addresses of the typically 8 neighboring tiles of the same size, without
+        constructing OpenGeoTile objects.
+        @param eight_point_direction None for all neighbors, or a direction ("N", "SE", ...) or
+        list of directions to restrict the result to
+        @return a set of tile addresses; may contain less than 8 addresses for tiles near the poles
+        '''
+        return return_neighbor_addresses(self.getTileAddress(), eight_point_direction)
 
-            new_OpenGeoTile = OpenGeoTile(lat=neighborLatitude, long=neighborLongitude, tile_size=self.getTileSize())
-            if not self.isSameTile(new_OpenGeoTile):
-                '''//don't add tiles that are the same as this one due to clipping near the poles'''
-                neighbors.add(new_OpenGeoTile)
+    def iterateRingAddresses(self, distance, manhattan=False):
+        '''
+        Lazily yield the addresses of all tiles of the same size at exactly the given tile distance
+        from this tile; a ring of distance 1 are the neighbors of this tile.
+        @param distance Chebyshev distance in tiles, >= 0
+        @param manhattan measure Manhattan instead of Chebyshev distance
+        @return an iterator over tile addresses, south to north and west to east; tiles beyond the
+        poles are left out, longitude wraps at the antimeridian
+        '''
+        return self.iterateDiskAddresses(distance, manhattan, min_distance=distance)
 
-        return neighbors
+    def iterateDiskAddresses(self, distance, manhattan=False, min_distance=0):
+        '''
+        Like {@link #iterateRingAddresses}, but yields the addresses of all tiles of the same size
+        within the given tile distance, including this tile itself.
+        @param min_distance leave out tiles closer to this tile than min_distance
+        '''
+        if distance < 0 or min_distance < 0:
+            raise Exception("Tile distance must not be negative")
+        row, column = self.getGridCoordinates()
+        for other_row, other_column in iterate_grid_coordinates_at_distance(
+                row, column, self.tile_size, min_distance, distance, manhattan):
+            yield return_address_of_grid_coordinates(other_row, other_column, self.tile_size)
 
     def isSameTile(self, potentialSameTile):
         '''/**
@@ -346,6 +609,8 @@ class OpenGeoTile():
         * @param potentialSameTile the OpenGeoTile to check
         * @return true if tile sizes and addresses are the same; false if not
         */'''
+        if isinstance(potentialSameTile, OpenGeoTile):
+            return self == potentialSameTile
         if potentialSameTile.getTileSize() != self.getTileSize():
             return False
         return potentialSameTile.getTileAddress() == self.getTileAddress()
@@ -358,15 +623,12 @@ class OpenGeoTile():
         *         false if not
         */'''
         if potentialNeighbor.getTileSize() == self.getTileSize():
-            '''//avoid iterating over neighbors for same tile'''
             if self.isSameTile(potentialNeighbor):
                 return False
-
-            neighbors = self.getNeighbors()
-            for neighbor in neighbors:
-                if potentialNeighbor.isSameTile(neighbor):
-                    return True
-            return False
+            row, column = self.getGridCoordinates()
+            other_row, other_column = potentialNeighbor.getGridCoordinates()
+            column_difference = return_wrapped_column_difference(column, other_column, self.getTileSize())
+            return abs(other_row - row) <= 1 and abs(column_difference) <= 1
         else:
             '''//tiles of different size are adjacent if at least one neighbor of the smaller tile,
             //but not the smaller tile itself, is contained within the bigger tile'''
@@ -380,11 +642,15 @@ class OpenGeoTile():
             if biggerTile.contains(smallerTile):
                 return False
 
-            neighbors = smallerTile.getNeighbors()
-            for neighbor in neighbors:
-                if biggerTile.contains(neighbor):
-                    return True
-            return False
+            ''' i.e. the smaller tile lies in the ring of smaller tiles around the bigger one '''
+            scale = ENCODING_BASE ** ((smallerTile.getTileSize().getCodeLength() - biggerTile.getTileSize().getCodeLength()) // 2)
+            row, column = smallerTile.getGridCoordinates()
+            bigger_row, bigger_column = biggerTile.getGridCoordinates()
+            if not bigger_row * scale - 1 <= row <= (bigger_row + 1) * scale:
+                return False
+            grid_columns = return_grid_dimensions(smallerTile.getTileSize())[1]
+            column_offset = (column - bigger_column * scale) % grid_columns
+            return column_offset <= scale or column_offset == grid_columns - 1
 
     def contains(self, potentialMember):
         '''/**
@@ -445,50 +711,23 @@ class OpenGeoTile():
             raise Exception("neighborTile must be neighbor")
         if neighborTile.getTileSize() != self.getTileSize():
             raise Exception("Tile sizes don't match")
-        self_tile_x = self.getTileAddress()[-2]
-        self_tile_y = self.getTileAddress()[-1]
-        other_tile_x = neighborTile.getTileAddress()[-2]
-        other_tile_y = neighborTile.getTileAddress()[-1]
+        row, column = self.getGridCoordinates()
+        other_row, other_column = neighborTile.getGridCoordinates()
 
         direction = ""
-        north_south = None
-
-        if self_tile_x != other_tile_x:
-            ''' one tile is above the other '''
-            if CODE_ALPHABET.find(self_tile_x) in [0, len(CODE_ALPHABET)-1] and CODE_ALPHABET.find(other_tile_x) in [0, len(CODE_ALPHABET)-1]:
-                ''' ajacent parent tiles '''
-                if CODE_ALPHABET.find(other_tile_x) == 0:
-                    ''' other tile is above -> neighborTile is north '''
-                    direction = direction + 'N'
-                else:
-                    direction = direction + 'S'
-            else:
-                if CODE_ALPHABET.find(self_tile_x) < CODE_ALPHABET.find(other_tile_x):
-                    ''' other tile is above -> neighborTile is north '''
-                    direction = direction + 'N'
-                else:
-                    ''' other tile is below -> neighborTile is south '''
-                    direction = direction + 'S'
-        if self_tile_y != other_tile_y:
-            ''' one tile is above the other '''
-            if CODE_ALPHABET.find(self_tile_y) in [0, len(CODE_ALPHABET)-1] and CODE_ALPHABET.find(other_tile_y) in [0, len(CODE_ALPHABET)-1]:
-                ''' ajacent parent tiles '''
-                if CODE_ALPHABET.find(other_tile_y) == 0:
-                    ''' other tile is right -> neighborTile is east '''
-                    direction = direction + 'E'
-                else:
-                    ''' other tile is left -> neighborTile is west '''
-                    direction = direction + 'W'
-            else:
-                if CODE_ALPHABET.find(self_tile_y) < CODE_ALPHABET.find(other_tile_y):
-                    ''' other tile is right -> neighborTile is east '''
-                    direction = direction + 'E'
-                else:
-                    ''' other tile is left -> neighborTile is west '''
-                    direction = direction + 'W'
+        if other_row > row:
+            ''' other tile is above -> neighborTile is north '''
+            direction = direction + 'N'
+        elif other_row < row:
+            direction = direction + 'S'
+        column_difference = return_wrapped_column_difference(column, other_column, self.getTileSize())
+        if column_difference > 0:
+            ''' other tile is right -> neighborTile is east '''
+            direction = direction + 'E'
+        elif column_difference < 0:
+            direction = direction + 'W'
         return direction
 
-
     def getCharacterIndex(self, c):
         '''//following definitions copied from OpenLocationCode.java'''
         index = "23456789CFGHJMPQRVWX".find(c.upper())
@@ -503,13 +742,7 @@ class OpenGeoTile():
         if otherTile.getTileSize() != self.getTileSize():
             raise Exception("Tile sizes don't match")
 
-        numIterations = self.tile_size.getCodeLength()/2 #1..5
-        tileDistance = 0
-        for i in range(int(numIterations)):
-            tileDistance *= 20
-            c1 = self.getTileAddress()[i*2]
-            c2 = otherTile.getTileAddress()[i*2]
-            tileDistance += self.characterDistance(c1,c2)
+        tileDistance = self.getGridCoordinates()[0] - otherTile.getGridCoordinates()[0]
 
         if absolute_value_bool:
             return abs(tileDistance)
@@ -520,25 +753,20 @@ class OpenGeoTile():
         if otherTile.getTileSize() != self.getTileSize():
             raise Exception("Tile sizes don't match")
 
-        numIterations = self.tile_size.getCodeLength()/2 #; //1..5
-        tileDistance = 0
-        for i in range(int(numIterations)):
-            tileDistance *= 20
-            c1 = self.getTileAddress()[i*2 + 1]
-            c2 = otherTile.getTileAddress()[i*2 + 1]
-            if i == 0:
-                '''//for the first longitudinal value, we need to take care of wrapping - basically,
-                   //if it's shorter to go the other way around, do so'''
-                firstDiff = self.characterDistance(c1, c2)
-                NUM_CHARACTERS_USED = 18 #; //360°/20° = 18
-                if abs(firstDiff) > NUM_CHARACTERS_USED/2:
-                    if firstDiff > 0:
-                        firstDiff -= NUM_CHARACTERS_USED
-                    else:
-                        firstDiff += NUM_CHARACTERS_USED
-                tileDistance += firstDiff
+        ''' columns split into the first longitudinal character and the remaining ones '''
+        scale = ENCODING_BASE ** (self.tile_size.getCodeLength() // 2 - 1)
+        first_column, column_remainder = divmod(self.getGridCoordinates()[1], scale)
+        other_first_column, other_column_remainder = divmod(otherTile.getGridCoordinates()[1], scale)
+
+        '''//for the first longitudinal value, we need to take care of wrapping - basically,
+           //if it's shorter to go the other way around, do so'''
+        firstDiff = first_column - other_first_column
+        if abs(firstDiff) > LONGITUDE_FIRST_DIGIT_COUNT/2:
+            if firstDiff > 0:
+                firstDiff -= LONGITUDE_FIRST_DIGIT_COUNT
             else:
-                tileDistance += self.characterDistance(c1, c2)
+                firstDiff += LONGITUDE_FIRST_DIGIT_COUNT
+        tileDistance = firstDiff * scale + column_remainder - other_column_remainder
 
         if absolute_value_bool:
             return abs(tileDistance)
@@ -548,135 +776,266 @@ class OpenGeoTile():
         if self.tile_size.getCodeLength() == desired_tile_size.getCodeLength():
             ''' tile is desired size '''
             return self
-        elif self.tile_size.getCodeLength() > desired_tile_size.getCodeLength():
+        tile_set = {OpenGeoTile(address) for address in self.iterateSubtileAddresses(desired_tile_size)}
+        return tile_set
+
+    def getSubtileDepth(self, desired_tile_size=TileSize.PINPOINT):
+        ''' number of address character pairs between this tile and its subtiles of desired_tile_size '''
+        if self.tile_size.getCodeLength() > desired_tile_size.getCodeLength():
             'desired_tile_size is too big'
             raise Exception("OLC padding larger than allowed by desired_tile_size")
-        iterations_needed = desired_tile_size.getCodeLength()/2 - self.tile_size.getCodeLength()/2
-        address_set = set([self.getTileAddress()])
-        for i in range(int(iterations_needed)):
-            address_set = return_set_of_subaddresses(address_set)
-        tile_set = {OpenGeoTile(address) for address in address_set}
-        return tile_set
+        return (desired_tile_size.getCodeLength() - self.tile_size.getCodeLength()) // 2
 
-    def returnSetOfBorderSubtiles(self, desired_tile_size=TileSize.PINPOINT, eight_point_direction=None):
+    def getSubtileCount(self, desired_tile_size=TileSize.PINPOINT):
+        '''
+        @return the number of subtiles of desired_tile_size covering this tile (20x20 per level)
+        '''
+        return len(BASE_20_LIST) ** self.getSubtileDepth(desired_tile_size)
+
+    def iterateSubtileAddresses(self, desired_tile_size=TileSize.PINPOINT):
+        '''
+        Lazily yield the addresses of all subtiles of desired_tile_size, without materializing
+        them. Subtiles are yielded in ascending address order, south-west corner first; the
+        n-th yielded address equals getNthSubtileAddress(n, desired_tile_size).
+        @throws Exception right away, not on iteration, if desired_tile_size is bigger than this tile
+        '''
+        depth = self.getSubtileDepth(desired_tile_size)
         address = self.getTileAddress()
+        return (address + ''.join(suffix) for suffix in itertools.product(BASE_20_LIST, repeat=depth))
 
-        if len(address) == TileSize.PINPOINT.getCodeLength():
+    def iterateSubtileIds(self, desired_tile_size=TileSize.PINPOINT):
+        '''
+        Like {@link #iterateSubtileAddresses}, but yields packed tile ids (see PackedTile), in the
+        same order.
+        '''
+        depth = self.getSubtileDepth(desired_tile_size)
+        level = desired_tile_size.getCodeLength() // 2
+        base_id = (self.getTileId() & ~TILE_ID_LEVEL_MASK) | level
+        ''' value of every character pair at each depth below this tile '''
+        pair_values = []
+        for i in range(depth):
+            pair_shift = return_tile_id_prefix_shift(self.tile_size.getCodeLength() + 2 * (i + 1))
+            pair_values.append([
+                ((CODE_ALPHABET_INDEX[pair[0]] << TILE_ID_DIGIT_BITS) | CODE_ALPHABET_INDEX[pair[1]]) << pair_shift
+                for pair in BASE_20_LIST
+            ])
+        for pair_combination in itertools.product(*pair_values):
+            yield base_id | sum(pair_combination)
+
+    def getNthSubtileAddress(self, n, desired_tile_size=TileSize.PINPOINT):
+        '''
+        Indexed access to the subtiles of desired_tile_size, e.g. to split them into chunks.
+        @param n index in the order of {@link #iterateSubtileAddresses}, 0 <= n < getSubtileCount()
+        @return the address of the n-th subtile
+        '''
+        if not 0 <= n < self.getSubtileCount(desired_tile_size):
+            raise Exception("Subtile index out of range")
+        suffix = ''
+        for i in range(self.getSubtileDepth(desired_tile_size)):
+            n, pair_index = divmod(n, len(BASE_20_LIST))
+            suffix = BASE_20_LIST[pair_index] + suffix
+        return self.getTileAddress() + suffix
+
+    def returnSetOfBorderSubtiles(self, desired_tile_size=TileSize.PINPOINT, eight_point_direction=None):
+        if len(self.getTileAddress()) == TileSize.PINPOINT.getCodeLength():
             ''' address already minimum possible size '''
             return None
-        elif self.tile_size.getCodeLength() > desired_tile_size.getCodeLength():
-            'desired_tile_size is too big'
-            raise Exception("OLC padding larger than allowed by desired_tile_size")
-
-        iterations_needed = int(desired_tile_size.getCodeLength()/2 - self.tile_size.getCodeLength()/2)
-
-        north_set = set()
-        east_set = set()
-        south_set = set()
-        west_set = set()
+        return {return_tile_of_address(address)
+                for address in self.iterateBorderSubtileAddresses(desired_tile_size, eight_point_direction)}
 
+    def iterateBorderSubtileAddresses(self, desired_tile_size=TileSize.PINPOINT, eight_point_direction=None):
+        '''
+        Lazily yield the addresses of the subtiles of desired_tile_size along the border of this
+        tile, each one once.
+        @param eight_point_direction None for the whole border; "N", "E", "S" or "W" for the
+        subtiles along one side; "NW", "NE", "SE" or "SW" for the single corner subtile
+        '''
+        address = self.getTileAddress()
+        depth = self.getSubtileDepth(desired_tile_size)
         if isinstance(eight_point_direction, str):
             eight_point_direction = eight_point_direction.upper()
 
-        set_of_border_subaddresses = set()
-        if eight_point_direction is None:
-            ''' all borders '''
-            ''' traveling salesman problem '''
-            ''' let's do it once, and try to reduce by swaping digits '''
-            all_border_set = memoized_digit_dict.get(f"A{iterations_needed}")
-            if not all_border_set:
-                north_base_set = memoized_digit_dict.get(f"N{iterations_needed}")
-                if not north_base_set:
-                    self.memoizeDigitDict("N", iterations_needed)
-
-
-                north_set = memoized_digit_dict.get(f"N{iterations_needed}")
-                east_set = memoized_digit_dict.get(f"E{iterations_needed}", set())
-                south_set = memoized_digit_dict.get(f"S{iterations_needed}", set())
-                west_set = memoized_digit_dict.get(f"W{iterations_needed}", set())
-                east_exists = east_set != set()
-                south_exists = south_set != set()
-                west_exists = west_set != set()
-                for base in north_set:
-                    east_base = ""
-                    south_base = ""
-                    west_base = ""
-                    base_tuple_list = re.findall('..', base)
-                    ''' north will be   Xd
-                        east            dX
-                        south           2d
-                        west            d2'''
-                    for n_tuple in base_tuple_list:
-                        relevant_digit = n_tuple[1]
-                        if not east_exists:
-                            east_base += relevant_digit + "X"
-                        if not south_exists:
-                            south_base += "2" + relevant_digit
-                        if not west_exists:
-                            west_base += relevant_digit + "2"
-                    if not east_exists:
-                        east_set.add(east_base)
-                    if not south_exists:
-                        south_set.add(south_base)
-                    if not west_exists:
-                        west_set.add(west_base)
-                memoized_digit_dict[f"E{iterations_needed}"] = east_set
-                memoized_digit_dict[f"S{iterations_needed}"] = south_set
-                memoized_digit_dict[f"W{iterations_needed}"] = west_set
-                all_border_set = north_set | east_set | south_set | west_set
-                memoized_digit_dict[f"A{iterations_needed}"] = all_border_set
-            return {OpenGeoTile(address+base) for base in all_border_set}
-
-        elif len(eight_point_direction) == 1:
-            ''' North, South, East, or West '''
-            base_set = memoized_digit_dict.get(f"{eight_point_direction}{iterations_needed}")
-            if not base_set:
-                self.memoizeDigitDict(eight_point_direction, iterations_needed)
-
-            base_set = memoized_digit_dict.get(f'{eight_point_direction}{iterations_needed}')
-            return {OpenGeoTile(address + base) for base in base_set}
-        elif len(eight_point_direction) == 2:
-            ''' NW, NE, SW, SE... should return only one tile'''
-            ordinal_digit_dict = {
-                'NW': 'X2',
-                'NE': 'XX',
-                'SE': '2X',
-                'SW': '22'
+        if eight_point_direction is None and depth == 0:
+            ''' the tile itself is its only subtile, on all sides at once '''
+            yield address
+        elif eight_point_direction is None:
+            ''' all borders; the corners are part of the north and south sides '''
+            for suffix in itertools.chain(iterate_border_suffixes('N', depth), iterate_border_suffixes('S', depth)):
+                yield address + suffix
+            for suffix in itertools.chain(iterate_border_suffixes('E', depth), iterate_border_suffixes('W', depth)):
+                if suffix[0::2] not in ('X' * depth, '2' * depth):
+                    yield address + suffix
+        else:
+            for suffix in iterate_border_suffixes(eight_point_direction, depth):
+                yield address + suffix
+
+
+DEFAULT_TILE_CACHE_SIZE = 100000
+
+class OpenGeoTileCache():
+    '''
+    A bounded, thread-safe least-recently-used cache of OpenGeoTile objects, keyed by normalized
+    (upper case) tile address. Tiles returned from the cache are shared between all callers, so
+    they are frozen: setting any of their attributes raises an AttributeError.
+    '''
+    def __init__(self, max_size=DEFAULT_TILE_CACHE_SIZE):
+        if max_size < 1:
+            raise Exception("max_size must be positive")
+        self.max_size = max_size
+        self.tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def getTile(self, tile_address):
+        '''
+        @param tile_address a tile address, see OpenGeoTile.getTileAddress()
+        @return the cached OpenGeoTile for this address, constructing it on a cache miss
+        '''
+        tile_address = tile_address.upper()
+        with self.lock:
+            tile = self.tiles.get(tile_address)
+            if tile is not None:
+                self.tiles.move_to_end(tile_address)
+                self.hits += 1
+                return tile
+            self.misses += 1
+        ''' construct outside of the lock; if two threads miss the same address, one tile wins '''
+        tile = OpenGeoTile(tile_address).freeze()
+        with self.lock:
+            tile = self.tiles.setdefault(tile_address, tile)
+            if len(self.tiles) > self.max_size:
+                self.tiles.popitem(last=False)
+        return tile
+
+    def getStats(self):
+        '''
+        @return a dict with the number of cache hits and misses, the current and the maximum size
+        '''
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.tiles),
+                "max_size": self.max_size,
             }
-            base = ''
-            for i in range(iterations_needed):
-                base += ordinal_digit_dict.get(eight_point_direction)
-            return {OpenGeoTile(address + base)}
 
+    def clear(self):
+        with self.lock:
+            self.tiles.clear()
+            self.hits = 0
+            self.misses = 0
+
+''' the tile cache is optional; None while disabled '''
+tile_cache = None
 
-    def memoizeDigitDict(self, eight_point_direction, iterations_needed):
-        base_set = memoized_digit_dict.get(f"{eight_point_direction}{iterations_needed}")
-        if not base_set:
-            quickest_i = 0
-            for i in reversed(range(iterations_needed)):
-                if memoized_digit_dict.get(f"{eight_point_direction}{i + 1}"):
-                    quickest_i = i
-                    break
-            for i in range(quickest_i, iterations_needed):
-                existing_bases = memoized_digit_dict.get(f"{eight_point_direction}{i + 1}")
-                next_set = {existing_base + base for existing_base in existing_bases for base in memoized_digit_dict.get(f"{eight_point_direction}1")}
-                memoized_digit_dict[f"{eight_point_direction}{i + 2}"] = next_set
+def enable_tile_cache(max_size=DEFAULT_TILE_CACHE_SIZE):
+    ''' route tile construction by address through a shared OpenGeoTileCache of max_size tiles '''
+    global tile_cache
+    tile_cache = OpenGeoTileCache(max_size)
+    return tile_cache
 
+def disable_tile_cache():
+    global tile_cache
+    tile_cache = None
 
+def get_tile_cache():
+    ''' the active OpenGeoTileCache, or None if caching is disabled '''
+    return tile_cache
 
+def return_tile_of_address(tile_address):
+    ''' OpenGeoTile(tile_address), served from the tile cache if it is enabled '''
+    cache = tile_cache
+    if cache is None:
+        return OpenGeoTile(tile_address)
+    return cache.getTile(tile_address)
 
+def return_tile_of_lat_long(lat, long, tile_size=TileSize.PINPOINT):
+    ''' OpenGeoTile(lat=lat, long=long, tile_size=tile_size), served from the tile cache if enabled '''
+    code = olc.encode(lat, long, tile_size.getCodeLength())
+    return return_tile_of_address(code.replace(SEPARATOR, "")[:tile_size.getCodeLength()])
 
 
+class PackedTile():
+    '''
+    A compact alternative to {@link OpenGeoTile}: the tile is held as a single packed integer id
+    (tile level plus interleaved latitude/longitude address characters) in a __slots__ object,
+    without strings or a per-object dict. Conversion to and from tile addresses, plus codes and
+    OpenGeoTile objects is lossless; containment and parent lookups are integer shifts.
+    '''
+    __slots__ = ('tile_id',)
+
+    def __init__(self, tile_id):
+        return_code_length_of_tile_id(tile_id)
+        self.tile_id = tile_id
 
+    @classmethod
+    def fromTileAddress(cls, tile_address):
+        return cls(return_tile_id_of_address(tile_address))
 
+    @classmethod
+    def fromCode(cls, plus_code, tile_size=None):
+        return cls.fromOpenGeoTile(OpenGeoTile(plus_code, tile_size))
 
+    @classmethod
+    def fromOpenGeoTile(cls, tile):
+        return cls(tile.getTileId())
 
+    def toOpenGeoTile(self):
+        return OpenGeoTile(self.getTileAddress())
 
+    def getTileId(self):
+        return self.tile_id
+
+    def getTileSize(self):
+        return TILE_SIZE_BY_CODE_LENGTH[return_code_length_of_tile_id(self.tile_id)]
+
+    def getTileAddress(self):
+        return return_address_of_tile_id(self.tile_id)
+
+    def getTileOpenLocationCode(self):
+        return return_code_of_tile_address(self.getTileAddress())
 
+    def getGridCoordinates(self):
+        return return_grid_coordinates_of_address(self.getTileAddress())
 
+    def getTileAddressPrefix(self):
+        '''
+        @return this tile's address with the final two characters removed. In case of a GLOBAL
+        tile, returns the empty string.
+        '''
+        parent_tile_id = return_parent_tile_id(self.tile_id)
+        if parent_tile_id is None:
+            return ""
+        return return_address_of_tile_id(parent_tile_id)
 
+    def getParentTileAddress(self):
+        return self.getTileAddressPrefix()
 
+    def getParentTile(self):
+        '''
+        @return the next biggest PackedTile at this location, or None for a GLOBAL tile
+        '''
+        parent_tile_id = return_parent_tile_id(self.tile_id)
+        if parent_tile_id is None:
+            return None
+        return PackedTile(parent_tile_id)
 
+    def isSameTile(self, potentialSameTile):
+        return self.tile_id == potentialSameTile.getTileId()
 
+    def contains(self, potentialMember):
+        '''
+        @param potentialMember the PackedTile (or OpenGeoTile) to check
+        @return true if the area potentialMember falls within the area of this tile, including
+        cases where both are the same; false if not
+        '''
+        return tile_id_contains(self.tile_id, potentialMember.getTileId())
 
+    def __eq__(self, other):
+        if not isinstance(other, PackedTile):
+            return NotImplemented
+        return self.tile_id == other.tile_id
 
+    def __hash__(self):
+        return hash(self.tile_id)
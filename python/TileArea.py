@@ -1,16 +1,96 @@
 from openlocationcode import openlocationcode as olc
-from OpenGeoTile import OpenGeoTile, TileSize
-from operator import methodcaller
+from OpenGeoTile import (OpenGeoTile, TileSize, CODE_ALPHABET, BASE_20_LIST, ENCODING_BASE,
+                         LATITUDE_FIRST_DIGIT_COUNT, LONGITUDE_FIRST_DIGIT_COUNT, BORDER_PAIRS, EIGHT_POINT_DIRECTION_DELTAS,
+                         SEPARATOR, TILE_SIZE_BY_CODE_LENGTH, return_address_of_grid_coordinates, return_grid_coordinates_of_address,
+                         return_grid_dimensions, return_shifted_address, return_tile_of_address,
+                         return_tile_of_lat_long)
 from collections.abc import Iterable
-import re
-import pprint
-pp = pprint.pformat
-
+import bisect
+import math
+import heapq
+
+
+''' merging a group of subtiles into their parent needs at least this many of the 20x20 subtiles
+    to be part of the area; less would lead to all additions snowballing into a full global tile '''
+MIN_SUBTILES_PER_TILE = 2
+MAX_SUBTILES_PER_TILE = 20*20
+
+''' the direction pointing back, e.g. "SW" for "NE" '''
+OPPOSITE_DIRECTIONS = {
+    direction: next(opposite for opposite, opposite_delta in EIGHT_POINT_DIRECTION_DELTAS.items()
+                    if opposite_delta == (-delta[0], -delta[1]))
+    for direction, delta in EIGHT_POINT_DIRECTION_DELTAS.items()
+}
+
+
+def return_merged_intervals(intervals):
+    ''' sorted union of inclusive (start, end) intervals, joining overlapping and adjacent ones '''
+    merged_intervals = []
+    for start, end in sorted(intervals):
+        if merged_intervals and start <= merged_intervals[-1][1] + 1:
+            merged_intervals[-1] = (merged_intervals[-1][0], max(merged_intervals[-1][1], end))
+        else:
+            merged_intervals.append((start, end))
+    return merged_intervals
+
+def return_wrapped_intervals(intervals, grid_columns):
+    ''' column intervals reaching past the antimeridian split into intervals within 0..grid_columns-1 '''
+    wrapped_intervals = []
+    for start, end in intervals:
+        if end - start + 1 >= grid_columns:
+            return [(0, grid_columns - 1)]
+        wrapped_start, wrapped_end = start % grid_columns, end % grid_columns
+        if wrapped_start <= wrapped_end:
+            wrapped_intervals.append((wrapped_start, wrapped_end))
+        else:
+            wrapped_intervals.extend([(wrapped_start, grid_columns - 1), (0, wrapped_end)])
+    return return_merged_intervals(wrapped_intervals)
+
+def return_intersected_intervals(intervals, other_intervals):
+    ''' intersection of two sorted lists of disjoint, inclusive (start, end) intervals '''
+    intersected_intervals = []
+    index, other_index = 0, 0
+    while index < len(intervals) and other_index < len(other_intervals):
+        start = max(intervals[index][0], other_intervals[other_index][0])
+        end = min(intervals[index][1], other_intervals[other_index][1])
+        if start <= end:
+            intersected_intervals.append((start, end))
+        if intervals[index][1] < other_intervals[other_index][1]:
+            index += 1
+        else:
+            other_index += 1
+    return intersected_intervals
+
+def return_row_intervals_of_grid_coordinates(grid_coordinates, tile_size, distance=0):
+    '''
+    Row-interval representation of the tiles of tile_size at the given grid coordinates, dilated
+    by distance tiles in every direction (including diagonally). Columns of each row are merged
+    into intervals first, so that every row of the result is built from intervals, not tiles.
+    @param grid_coordinates iterable of (row, column) tuples, see OpenGeoTile.getGridCoordinates()
+    @return a dict of row -> sorted list of inclusive (first column, last column) intervals; rows
+    beyond the poles are left out, columns wrap at the antimeridian
+    '''
+    grid_rows, grid_columns = return_grid_dimensions(tile_size)
+    intervals_by_row = {}
+    for row, column in grid_coordinates:
+        intervals_by_row.setdefault(row, []).append((column - distance, column + distance))
+    dilated_intervals_by_row = {}
+    for row, intervals in intervals_by_row.items():
+        merged_intervals = return_merged_intervals(intervals)
+        for dilated_row in range(max(0, row - distance), min(grid_rows, row + distance + 1)):
+            dilated_intervals_by_row.setdefault(dilated_row, []).extend(merged_intervals)
+    return {row: return_wrapped_intervals(intervals, grid_columns)
+            for row, intervals in sorted(dilated_intervals_by_row.items())}
 
 class TileArea():
     '''/**
      * An area defined by one or more {@link OpenGeoTile} tiles
     */'''
+    ''' tiles are merged into their parent as soon as subtiles_per_tile of its subtiles have been
+        added, unless they are already of max_allowed_tile_size or bigger; see MergingTileArea '''
+    subtiles_per_tile = MAX_SUBTILES_PER_TILE
+    max_allowed_tile_size = TileSize.GLOBAL
+
     def __init__(self, tile_or_tile_iterable):
         '''/**
          * default constructor
@@ -26,10 +106,78 @@ class TileArea():
         if isinstance(tile_or_tile_iterable, OpenGeoTile):
             tile_or_tile_iterable = set([tile_or_tile_iterable])
 
-        self.tile_set = set()
-        for newTile in tile_or_tile_iterable:
-            self.addTile(newTile, convert_to_shortest_covering_tile_set=False)
-        self.tile_set = self.getShortestCoveringTileSet()
+        self.tile_set = tile_or_tile_iterable
+
+    @property
+    def tile_set(self):
+        ''' the tiles defining this area; assign a new set to replace them '''
+        return self.indexed_tile_set
+
+    @tile_set.setter
+    def tile_set(self, tile_set):
+        self.indexed_tile_set = set()
+        self.address_set = set()
+        ''' for every address prefix of a member tile, the character pairs leading towards member
+            tiles below it, and the number of member tiles directly below it '''
+        self.child_pairs_by_prefix = {}
+        self.member_child_counts = {}
+        ''' number of member tiles per code length, see getSmallestTileSize() '''
+        self.tile_counts_by_code_length = {}
+        ''' sorted packed tile ids of the member tiles per code length, built on demand by
+            returnMemberTileIdArrays() and dropped on every change '''
+        self.member_tile_id_arrays = None
+        for tile in list(tile_set):
+            self.addTile(tile)
+
+    def addTileToTileSet(self, tile):
+        '''
+        Add a tile to tile_set, keeping the address index used by {@link #contains} in sync. All
+        additions to tile_set need to go through this method.
+        '''
+        tile_address = tile.getTileAddress()
+        self.indexed_tile_set.add(tile)
+        self.address_set.add(tile_address)
+        for prefix_length in range(0, len(tile_address), 2):
+            prefix = tile_address[:prefix_length]
+            self.child_pairs_by_prefix.setdefault(prefix, set()).add(tile_address[prefix_length:prefix_length + 2])
+        parent_address = tile.getTileAddressPrefix()
+        self.member_child_counts[parent_address] = self.member_child_counts.get(parent_address, 0) + 1
+        code_length = len(tile_address)
+        self.tile_counts_by_code_length[code_length] = self.tile_counts_by_code_length.get(code_length, 0) + 1
+        self.member_tile_id_arrays = None
+
+    def removeTileFromTileSet(self, tile):
+        ''' counterpart of {@link #addTileToTileSet} '''
+        tile_address = tile.getTileAddress()
+        self.indexed_tile_set.discard(tile)
+        self.address_set.discard(tile_address)
+        parent_address = tile.getTileAddressPrefix()
+        self.member_child_counts[parent_address] -= 1
+        if self.member_child_counts[parent_address] == 0:
+            del self.member_child_counts[parent_address]
+        code_length = len(tile_address)
+        self.tile_counts_by_code_length[code_length] -= 1
+        if self.tile_counts_by_code_length[code_length] == 0:
+            del self.tile_counts_by_code_length[code_length]
+        self.member_tile_id_arrays = None
+        ''' prune prefixes that no longer lead to any member tile '''
+        address = tile_address
+        while address and address not in self.address_set and address not in self.child_pairs_by_prefix:
+            prefix = address[:-2]
+            child_pairs = self.child_pairs_by_prefix[prefix]
+            child_pairs.discard(address[-2:])
+            if child_pairs:
+                break
+            del self.child_pairs_by_prefix[prefix]
+            address = prefix
+
+    def iterateMemberSubtileAddresses(self, tile_address):
+        ''' addresses of all member tiles that are smaller than and contained in tile_address, bigger ones first '''
+        for pair in self.child_pairs_by_prefix.get(tile_address, ()):
+            subtile_address = tile_address + pair
+            if subtile_address in self.address_set:
+                yield subtile_address
+            yield from self.iterateMemberSubtileAddresses(subtile_address)
 
     def getShortestCoveringTileSet(self):
         '''/**
@@ -38,127 +186,76 @@ class TileArea():
          * TileArea, it can also include tiles that never have been added.
          * @return an ArrayList of {@link OpenGeoTile} tiles which fully cover the area of this TileArea
         */'''
-        # get address set list
-        existing_address_list_unsorted = [tile.getTileAddress() for tile in self.tile_set]
+        ''' tile_set is kept merged while tiles are added '''
+        return set(self.tile_set)
 
-        # filter out tiles subsumed in bigger tiles
-        ''' this should be parent tile in set '''
-        address_set = {t.getTileAddress() for t in self.tile_set}
-        tile_set_to_return = self.tile_set.copy()
-        for tile in self.tile_set:
-            relevant_address = tile.getTileAddress()
-            ''' here we shrink the tile address by 2 until it's an empty string '''
-            for i in range(int(len(relevant_address)/2)):
-                if tile in tile_set_to_return:
-                    relevant_address = relevant_address[0: len(relevant_address)-2]
-                    if relevant_address in address_set:
-                        tile_set_to_return.remove(tile)
-        '''
-            check if any tiles can be eliminate just by set of parents
-        '''
-        sub_global_parent_list = [t.getParentTileAddress() for t in tile_set_to_return if len(t.getTileAddress()) != 2]
-        counted_set = set()
-        reduce = False
-        for p_address in sub_global_parent_list:
-            if not p_address in counted_set:
-                if sub_global_parent_list.count(p_address) == 20*20:
-                    reduce = True
-                    break
-                else:
-                    counted_set.add(p_address)
-        if not reduce:
-            return tile_set_to_return
-
-        ''' reduce '''
-        pinpoints = {t for t in self.tile_set if len(t.getTileAddress()) == TileSize.PINPOINT.getCodeLength()}
-        neighborhoods = {t for t in self.tile_set if len(t.getTileAddress()) == TileSize.NEIGHBORHOOD.getCodeLength()}
-        districts = {t for t in self.tile_set if len(t.getTileAddress()) == TileSize.DISTRICT.getCodeLength()}
-        regions = {t for t in self.tile_set if len(t.getTileAddress()) == TileSize.REGION.getCodeLength()}
-        global_set = {t for t in self.tile_set if len(t.getTileAddress()) == TileSize.GLOBAL.getCodeLength()}
-
-        pinpoints,     neighborhoods = self.reduceTileSet(pinpoints,     neighborhoods)
-        print('pinpoints:', {t.getTileAddress() for t in pinpoints})
-        neighborhoods, districts     = self.reduceTileSet(neighborhoods, districts)
-        print('neighborhoods:', {t.getTileAddress() for t in neighborhoods})
-        districts,     regions       = self.reduceTileSet(districts,     regions)
-        print('districts:', {t.getTileAddress() for t in districts})
-        regions,       global_set    = self.reduceTileSet(regions,       global_set)
-        print('regions:', {t.getTileAddress() for t in regions})
-        print('global_set:', {t.getTileAddress() for t in global_set})
-
-        tile_set_to_return = pinpoints | neighborhoods | districts | regions | global_set
-        print('tile_set_to_return:', {t.getTileAddress() for t in tile_set_to_return})
-        return tile_set_to_return
-
-    def reduceTileSet(self, set_of_tiles_by_address_size, parent_address_set):
-        list_of_tiles = list(set_of_tiles_by_address_size.copy())
-        counted_set = set()
-        for tile in list_of_tiles:
-            if tile.getParentTileAddress() not in counted_set:
-                parent_addresses = [t.getParentTileAddress() for t in set_of_tiles_by_address_size]
-                if parent_addresses.count(tile.getParentTileAddress()) == 20*20:
-                    new_tile = OpenGeoTile(tile.getParentTileAddress())
-                    parent_address_set.add(new_tile)
-                    offending_tiles = {t for t in list_of_tiles if t.getTileAddress().startswith(tile.getParentTileAddress())}
-                    for offending_tile in offending_tiles:
-                        set_of_tiles_by_address_size.remove(offending_tile)
-                counted_set.add(tile.getParentTileAddress())
-        return set_of_tiles_by_address_size, parent_address_set
-
-        '''
-        existing_address_list_without_subsumption = []
-        existing_address_list_shortest_to_longest = sorted(existing_address_list_unsorted, key=len)
-        for unfiltered_address in existing_address_list_shortest_to_longest:
-            tile_is_subtile = False
-            for filtered_address in existing_address_list_without_subsumption:
-                if not tile_is_subtile:
-                    if len(filtered_address) < len(unfiltered_address):
-                        if unfiltered_address.startswith(filtered_address):
-                            tile_is_subtile = True
-            if not tile_is_subtile:
-                existing_address_list_without_subsumption.append(unfiltered_address)
-        '''
-
-        # sort from biggest tiles to smallest
-        # existing_address_list_longest_to_shortest = sorted(existing_address_list_without_subsumption, key=len, reverse=True)
-        '''
-        create dict like this:
-        take the last two digits, and split off their parent,
-        if the parent list ends up equaling 20x20 length it's full, add parent letters
-        to dict in the same method,
-        go from smallest to biggest, and it should work.
-        Then, after you make them, just unite all the parents with all the children
-        dict = {
-            parent: child_list,
-
-            "3333": ["22", "33"... etc],
-            "22": ["22", "33"... etc],
-
-        }'''
-        '''
-        address_dict = {}
-        for address in existing_address_list_longest_to_shortest:
-            #print("address:", address)
-            address_dict = self.recursiveShortestCoveringTileDictBuilder(address, address_dict)
-        #print("address_dict:", pp(address_dict))
-
-        shortest_covering_tile_set = set()
-        for parent, child_set in address_dict.items():
-            for child in child_set:
-                full_address = parent + child
-                shortest_covering_tile_set.add(OpenGeoTile(code=full_address))
-        return shortest_covering_tile_set
-        '''
-    def recursiveShortestCoveringTileDictBuilder(self, tile_address, address_dict):
-            parent, child = tile_address[:-2],  tile_address[-2:]
-            child_set = address_dict.get(parent, set())
-            child_set.add(child)
-            if len(child_set) == 20*20: # if full tile
-                del address_dict[parent]
-                return self.recursiveShortestCoveringTileDictBuilder(parent, address_dict)
-            else:
-                address_dict[parent] = child_set
-                return address_dict
+    def getCoveringTileSet(self, max_tile_count):
+        '''
+        Get at most max_tile_count tiles which together cover this TileArea, wasting as little area
+        as possible beyond it. Starting from the member tiles, groups of tiles are greedily replaced
+        by a common parent tile, always picking the parent that adds the least area outside of
+        this TileArea per tile saved.
+        @param max_tile_count the maximum number of tiles in the result
+        @return a set of {@link OpenGeoTile} tiles covering at least the area of this TileArea
+        @throws Exception if even the GLOBAL tiles touched by this area are more than max_tile_count
+        '''
+        if max_tile_count < 1:
+            raise Exception("Tile count must be positive")
+        ''' members inside other members (possible for a SimpleTileArea) don't add any area '''
+        tile_addresses = {tile_address for tile_address in self.address_set
+                          if not any(tile_address[:prefix_length] in self.address_set
+                                     for prefix_length in range(2, len(tile_address), 2))}
+        tile_count = len(tile_addresses)
+        if tile_count <= max_tile_count:
+            return {return_tile_of_address(tile_address) for tile_address in tile_addresses}
+
+        ''' areas are counted in PINPOINT tiles; for every possible parent tile, keep the number of
+            current tiles inside it and the area they cover '''
+        def return_tile_area(tile_address):
+            return MAX_SUBTILES_PER_TILE ** ((TileSize.PINPOINT.getCodeLength() - len(tile_address)) // 2)
+        tile_counts = {}
+        covered_areas = {}
+        for tile_address in tile_addresses:
+            tile_area = return_tile_area(tile_address)
+            for prefix_length in range(2, len(tile_address), 2):
+                prefix = tile_address[:prefix_length]
+                tile_counts[prefix] = tile_counts.get(prefix, 0) + 1
+                covered_areas[prefix] = covered_areas.get(prefix, 0) + tile_area
+
+        def return_merge_candidate(prefix):
+            ''' heap entry: wasted area per saved tile, then the number of saved tiles '''
+            saved_tiles = tile_counts[prefix] - 1
+            wasted_area = return_tile_area(prefix) - covered_areas[prefix]
+            return (wasted_area / saved_tiles, -saved_tiles, prefix, tile_counts[prefix])
+
+        candidates = [return_merge_candidate(prefix) for prefix in tile_counts if tile_counts[prefix] > 1]
+        heapq.heapify(candidates)
+        merged_addresses = set()
+        while tile_count > max_tile_count:
+            if not candidates:
+                raise Exception("TileArea can't be covered by this few tiles")
+            cost, negative_saved_tiles, prefix, candidate_tile_count = heapq.heappop(candidates)
+            if (candidate_tile_count != tile_counts[prefix]
+                    or any(prefix[:prefix_length] in merged_addresses for prefix_length in range(2, len(prefix) + 1, 2))):
+                ''' outdated entry, or already inside a merged tile '''
+                continue
+            merged_addresses.add(prefix)
+            saved_tiles = tile_counts[prefix] - 1
+            wasted_area = return_tile_area(prefix) - covered_areas[prefix]
+            tile_count -= saved_tiles
+            for prefix_length in range(2, len(prefix), 2):
+                parent_prefix = prefix[:prefix_length]
+                tile_counts[parent_prefix] -= saved_tiles
+                covered_areas[parent_prefix] += wasted_area
+                if tile_counts[parent_prefix] > 1:
+                    heapq.heappush(candidates, return_merge_candidate(parent_prefix))
+
+        def is_inside_merged_tile(tile_address):
+            return any(tile_address[:prefix_length] in merged_addresses
+                       for prefix_length in range(2, len(tile_address), 2))
+        return {return_tile_of_address(tile_address)
+                for tile_address in tile_addresses | merged_addresses
+                if not is_inside_merged_tile(tile_address)}
 
     def contains(self, tile):
         '''/**
@@ -167,11 +264,17 @@ class TileArea():
          * @param tile an OpenGeoTile, the area of which will be checked
          * @return true if the whole area of {@code tile} is inside this object's area, false if not
         */'''
-        for existing_tile in self.tile_set:
-            if existing_tile.contains(tile):
+        ''' a tile is contained if its own address or the address of one of its parents is part of
+            this area, which takes at most five set lookups '''
+        return self.containsTileAddress(tile.getTileAddress())
+        # public abstract boolean contains(OpenGeoTile tile);
+
+    def containsTileAddress(self, tile_address):
+        ''' {@link #contains} for a tile address, without constructing an OpenGeoTile '''
+        for prefix_length in range(2, len(tile_address) + 1, 2):
+            if tile_address[:prefix_length] in self.address_set:
                 return True
         return False
-        # public abstract boolean contains(OpenGeoTile tile);
 
     def getSmallestTileSize(self):
         '''/**
@@ -179,22 +282,37 @@ class TileArea():
          * {@link OpenGeoTile} used to define the area of this object.
          * @return the smallest tile size (=longest address) used by one of the tiles of this area
         */'''
-        # sorting by getTileAddress, reversed, so the longest address is first, which is the smallest tile
-        smallest_tile = sorted(list(self.tile_set), key=lambda x: len(x.getTileAddress()), reverse=True)[0]
-        return smallest_tile.getTileSize()
+        ''' GLOBAL for an empty area, as in the Java implementations '''
+        if not self.tile_counts_by_code_length:
+            return TileSize.GLOBAL
+        return TILE_SIZE_BY_CODE_LENGTH[max(self.tile_counts_by_code_length)]
 
-    def addNonContainedTile(self, nonContainedTile, convert_to_shortest_covering_tile_set=True):
+    def addNonContainedTile(self, nonContainedTile):
         '''/**
          * Package-private method to add a code that has already been checked to NOT be contained yet.
          * @param newTile a full OpenGeoTile, the area of which will be added to this object's area
         */'''
         if not isinstance(nonContainedTile, OpenGeoTile):
             raise Exception("New TileArea must contain valid OpenGeoTile tiles")
-        self.tile_set.add(nonContainedTile)
-        if convert_to_shortest_covering_tile_set:
-            self.tile_set = self.getShortestCoveringTileSet()
-
-    def addTile(self, newTile, convert_to_shortest_covering_tile_set=True):
+        tile_address = nonContainedTile.getTileAddress()
+        for subtile_address in list(self.iterateMemberSubtileAddresses(tile_address)):
+            self.removeTileFromTileSet(return_tile_of_address(subtile_address))
+
+        parent_address = nonContainedTile.getTileAddressPrefix()
+        ''' we're NOT merging the group of tiles this tile belongs to, if
+            1. the group is not complete yet
+            2. the group already consists of GLOBAL-sized tiles
+            3. the tile size already is or exceeds the maximum allowed tile size '''
+        if (self.member_child_counts.get(parent_address, 0) < self.subtiles_per_tile - 1
+                or nonContainedTile.getTileSize() == TileSize.GLOBAL
+                or len(tile_address) <= self.max_allowed_tile_size.getCodeLength()):
+            self.addTileToTileSet(nonContainedTile)
+        else:
+            ''' adding this tile completes its group to the parent tile, which replaces all of them;
+                the parent can't be contained yet either, or this tile would have been '''
+            self.addNonContainedTile(return_tile_of_address(parent_address))
+
+    def addTile(self, newTile):
         '''/**
          * Adds the area defined by the {@link OpenGeoTile} newTile to the area represented by this
          * object. Subsequent calls to {@link #contains(OpenGeoTile)} must return true for the
@@ -204,7 +322,7 @@ class TileArea():
         if not isinstance(newTile, OpenGeoTile):
             raise Exception("New TileArea must contain valid OpenGeoTile tiles")
         if not self.contains(newTile):
-            self.addNonContainedTile(newTile, convert_to_shortest_covering_tile_set=convert_to_shortest_covering_tile_set)
+            self.addNonContainedTile(newTile)
 
     def addTileArea(self, newTileArea):
         '''/**
@@ -213,8 +331,110 @@ class TileArea():
          * @param newTileArea another TileArea
          */'''
         for newTile in newTileArea.tile_set:
-            self.addTile(newTile, convert_to_shortest_covering_tile_set=False)
-        self.tile_set = self.getShortestCoveringTileSet()
+            self.addTile(newTile)
+
+    def removeTile(self, tile):
+        '''
+        Removes the area defined by the {@link OpenGeoTile} tile from the area represented by this
+        object. A bigger tile containing it is split only along the path down to tile: on each
+        level, the 399 siblings of that path replace their parent. Smaller tiles inside tile are
+        removed.
+        @param tile a full OpenGeoTile, the area of which will be removed from this object's area
+        '''
+        if not isinstance(tile, OpenGeoTile):
+            raise Exception("Removed tile must be a valid OpenGeoTile")
+        tile_address = tile.getTileAddress()
+        for subtile_address in list(self.iterateMemberSubtileAddresses(tile_address)):
+            self.removeTileFromTileSet(return_tile_of_address(subtile_address))
+        for prefix_length in range(2, len(tile_address) + 1, 2):
+            member_address = tile_address[:prefix_length]
+            if member_address not in self.address_set:
+                continue
+            self.removeTileFromTileSet(return_tile_of_address(member_address))
+            for split_length in range(prefix_length, len(tile_address), 2):
+                path_pair = tile_address[split_length:split_length + 2]
+                for pair in BASE_20_LIST:
+                    sibling_address = tile_address[:split_length] + pair
+                    if pair != path_pair and sibling_address not in self.address_set:
+                        self.addTileToTileSet(return_tile_of_address(sibling_address))
+
+    def removeTileArea(self, otherTileArea):
+        '''
+        Removes the area defined by another TileArea from the area represented by this object.
+        @param otherTileArea another TileArea
+        '''
+        for tile in list(otherTileArea.tile_set):
+            self.removeTile(tile)
+
+    def getSubtileCoverage(self, tile_address):
+        '''
+        The subtiles of tile_address (the GLOBAL tiles for '') overlapping this area.
+        @return a dict of address character pair -> True if that subtile is completely inside this area
+        '''
+        return {pair: tile_address + pair in self.address_set
+                for pair in self.child_pairs_by_prefix.get(tile_address, ())}
+
+    def returnCombinedTileAddresses(self, otherTileArea, keep_tile, tile_address='',
+                                    contained=False, other_contained=False):
+        '''
+        Walk the tiles of this and another area simultaneously, from the biggest tiles down, and
+        collect disjoint tiles covering the area in which keep_tile is true. A tile is only split
+        into its subtiles where one of the areas covers it partially, and complete groups of
+        subtiles are returned as their parent tile.
+        @param otherTileArea a TileArea, or any other area providing getSubtileCoverage()
+        @param keep_tile function of (in this area, in otherTileArea) returning whether a location
+        belongs to the result
+        @param tile_address the tile to start from; '' for the whole globe
+        @return a list of tile addresses
+        '''
+        subtile_coverage = {} if contained else self.getSubtileCoverage(tile_address)
+        other_subtile_coverage = {} if other_contained else otherTileArea.getSubtileCoverage(tile_address)
+        keep_uncovered_subtiles = bool(tile_address) and keep_tile(contained, other_contained)
+        if not subtile_coverage and not other_subtile_coverage:
+            return [tile_address] if keep_uncovered_subtiles else []
+
+        ''' subtiles neither area overlaps are covered the same way as this whole tile '''
+        if keep_uncovered_subtiles:
+            pairs = BASE_20_LIST
+        else:
+            pairs = sorted(subtile_coverage.keys() | other_subtile_coverage.keys())
+        combined_tile_addresses = []
+        complete = bool(tile_address) and len(pairs) == len(BASE_20_LIST)
+        for pair in pairs:
+            subtile_address = tile_address + pair
+            if pair in subtile_coverage or pair in other_subtile_coverage:
+                subtile_addresses = self.returnCombinedTileAddresses(
+                    otherTileArea, keep_tile, subtile_address,
+                    contained or subtile_coverage.get(pair, False),
+                    other_contained or other_subtile_coverage.get(pair, False))
+            else:
+                subtile_addresses = [subtile_address]
+            complete = complete and subtile_addresses == [subtile_address]
+            combined_tile_addresses.extend(subtile_addresses)
+        if complete:
+            return [tile_address]
+        return combined_tile_addresses
+
+    def combineTileArea(self, otherTileArea, keep_tile):
+        ''' new TileArea from {@link #returnCombinedTileAddresses} '''
+        return TileArea([return_tile_of_address(tile_address)
+                         for tile_address in self.returnCombinedTileAddresses(otherTileArea, keep_tile)])
+
+    def union(self, otherTileArea):
+        ''' @return a new TileArea covering the area of this or otherTileArea '''
+        return self.combineTileArea(otherTileArea, lambda contained, other_contained: contained or other_contained)
+
+    def intersection(self, otherTileArea):
+        ''' @return a new TileArea covering the area of both this and otherTileArea '''
+        return self.combineTileArea(otherTileArea, lambda contained, other_contained: contained and other_contained)
+
+    def difference(self, otherTileArea):
+        ''' @return a new TileArea covering the area of this but not otherTileArea '''
+        return self.combineTileArea(otherTileArea, lambda contained, other_contained: contained and not other_contained)
+
+    def symmetricDifference(self, otherTileArea):
+        ''' @return a new TileArea covering the area of exactly one of this and otherTileArea '''
+        return self.combineTileArea(otherTileArea, lambda contained, other_contained: contained != other_contained)
 
     def containsPlusCode(self, plus_code):
         '''/**
@@ -232,76 +452,121 @@ class TileArea():
          * @param longitude longitude value of the location to be checked
          * @return true if inside, false if not
         */'''
-        return self.contains(OpenGeoTile(lat=lat, long=long, tile_size=self.getSmallestTileSize()))
+        return self.contains(return_tile_of_lat_long(lat, long, self.getSmallestTileSize()))
+
+    def returnMemberTileIdArrays(self):
+        ''' {TileSize: sorted int64 array of the packed ids of all member tiles of that size} '''
+        if self.member_tile_id_arrays is None:
+            import TileArrays
+            addresses_by_code_length = {}
+            for tile_address in self.address_set:
+                addresses_by_code_length.setdefault(len(tile_address), []).append(tile_address)
+            self.member_tile_id_arrays = {}
+            for code_length, addresses in addresses_by_code_length.items():
+                tile_ids = TileArrays.return_tile_id_array_of_addresses(addresses)
+                tile_ids.sort()
+                self.member_tile_id_arrays[TILE_SIZE_BY_CODE_LENGTH[code_length]] = tile_ids
+        return self.member_tile_id_arrays
+
+    def containsLatLongs(self, lats, longs):
+        '''
+        Batch version of {@link #containsLatLong} for NumPy arrays (needs NumPy, see TileArrays).
+        All locations are encoded once at the smallest tile size of this area, then looked up with
+        a sorted search in the packed ids of the member tiles of each size.
+        @param lats array-like of latitudes
+        @param longs array-like of longitudes, same shape as lats
+        @return a boolean array of the same shape, true for locations inside this area
+        '''
+        import TileArrays
+        tile_ids = TileArrays.encode_tiles(lats, longs, self.getSmallestTileSize(), return_tile_ids=True)
+        return TileArrays.return_contained_mask(tile_ids, self.returnMemberTileIdArrays())
 
-    def getEdgeTileSet(self):
-        edge_addresses = set()
-        contained_addresses = set()
-        external_addresses = set()
-        for tile in self.tile_set:
-            tile_is_edge = False
-            if tile.tile_size.getCodeLength() != TileSize.PINPOINT.getCodeLength():
-                border_subtile_set = tile.returnSetOfBorderSubtiles()
-            else:
-                border_subtile_set = set([tile])
-            for subtile in border_subtile_set:
-                if not tile_is_edge:
-                    neighbors = subtile.getNeighbors()
-                    for neighbor in neighbors:
-                        if not tile_is_edge:
-                            if neighbor.getTileAddress() in contained_addresses:
-                                continue
-                            elif self.contains(neighbor):
-                                contained_addresses.add(neighbor.getTileAddress())
-                                continue
-                            elif neighbor.getTileAddress() in external_addresses:
-                                edge_addresses.add(tile.getTileAddress())
-                                tile_is_edge = True
-                                break
-                            elif not self.contains(neighbor):
-                                external_addresses.add(neighbor.getTileAddress())
-                                edge_addresses.add(tile.getTileAddress())
-                                tile_is_edge = True
-                                break
+    def isBorderCovered(self, tile_address, eight_point_direction):
+        '''
+        Check if the border of a tile on one side ("N", "E", "S" or "W") or in one corner ("NW",
+        "NE", "SE" or "SW") is completely inside this object's area, down to PINPOINT precision.
+        Only subtiles partially covered by this area are looked at.
+        '''
+        if self.containsTileAddress(tile_address):
+            return True
+        if tile_address not in self.child_pairs_by_prefix:
+            return False
+        return all(self.isBorderCovered(tile_address + pair, eight_point_direction)
+                   for pair in BORDER_PAIRS[eight_point_direction])
+
+    def isEdgeTileAddress(self, tile_address):
+        '''
+        Check if any location directly next to the tile at tile_address, including diagonally, is
+        outside of this object's area. Tiles beyond the poles don't count as outside.
+        '''
+        for eight_point_direction, (lat_diff, long_diff) in EIGHT_POINT_DIRECTION_DELTAS.items():
+            neighbor_address = return_shifted_address(tile_address, lat_diff, long_diff)
+            if neighbor_address is None:
+                continue
+            ''' the neighbor's border facing this tile '''
+            if not self.isBorderCovered(neighbor_address, OPPOSITE_DIRECTIONS[eight_point_direction]):
+                return True
+        return False
+
+    def getEdgeTileSet(self, tile_size=None):
+        '''
+        Get the tiles along the boundary of this area, i.e. those next to a location outside of it.
+        @param tile_size None for the member tiles of this area at their own size; otherwise the
+        boundary at this size: bigger member tiles contribute their border subtiles along the
+        boundary, smaller member tiles the tile of tile_size containing them
+        @return a set of {@link OpenGeoTile} tiles
+        '''
         edge_tile_set = set()
         for tile in self.tile_set:
-            if not tile in edge_tile_set:
-                for address in edge_addresses:
-                    if address.startswith(tile.getTileAddress()):
-                        edge_tile_set.add(tile)
-                        break
+            tile_address = tile.getTileAddress()
+            if not self.isEdgeTileAddress(tile_address):
+                continue
+            if tile_size is None or tile_size == tile.getTileSize():
+                edge_tile_set.add(tile)
+            elif tile_size.getCodeLength() < len(tile_address):
+                edge_tile_set.add(return_tile_of_address(tile_address[:tile_size.getCodeLength()]))
+            else:
+                for subtile_address in tile.iterateBorderSubtileAddresses(tile_size):
+                    if self.isEdgeTileAddress(subtile_address):
+                        edge_tile_set.add(return_tile_of_address(subtile_address))
         return edge_tile_set
 
+    def getDilatedTileArea(self, distance, tile_size=TileSize.PINPOINT):
+        '''
+        Grow this area by distance tiles of tile_size in every direction, including diagonally.
+        Only the tiles along the boundary are dilated, in a single pass over their row intervals.
+        Member tiles smaller than tile_size grow from the tile of tile_size containing them.
+        @return a new TileArea
+        '''
+        if distance < 0:
+            raise Exception("Tile distance must not be negative")
+        edge_grid_coordinates = (tile.getGridCoordinates() for tile in self.getEdgeTileSet(tile_size))
+        row_intervals = return_row_intervals_of_grid_coordinates(edge_grid_coordinates, tile_size, distance)
+        return self.union(RowIntervalTileArea(row_intervals, tile_size))
+
+    def getErodedTileArea(self, distance, tile_size=TileSize.PINPOINT):
+        '''
+        Shrink this area to the tiles of tile_size that are at least distance + 1 tiles away from
+        any tile of tile_size not completely inside this area, including diagonally.
+        @return a new TileArea
+        '''
+        if distance < 0:
+            raise Exception("Tile distance must not be negative")
+        outside_grid_coordinates = set()
+        for tile in self.getEdgeTileSet(tile_size):
+            if not self.contains(tile):
+                ''' tile of tile_size containing smaller member tiles '''
+                outside_grid_coordinates.add(tile.getGridCoordinates())
+                continue
+            for neighbor_address in tile.getNeighborAddresses():
+                if not self.containsTileAddress(neighbor_address):
+                    outside_grid_coordinates.add(return_grid_coordinates_of_address(neighbor_address))
+        row_intervals = return_row_intervals_of_grid_coordinates(outside_grid_coordinates, tile_size, distance)
+        return self.difference(RowIntervalTileArea(row_intervals, tile_size))
+
     def expandTileArea(self, tile_size, num_of_tiles=1):
-        for i in range(num_of_tiles):
-            new_area = SimpleTileArea()
-            print('empty:', new_area.tile_set)
-            edge_tile_set = self.getEdgeTileSet()
-            print('len edge_tile_set:', len(edge_tile_set))
-            for tile in edge_tile_set:
-                print('tile:', tile.getTileAddress())
-                neighbors = tile.getNeighbors()
-                for neighbor in neighbors:
-                    if not self.contains(neighbor) and not new_area.contains(neighbor):
-                        print('neighbor:', neighbor.getTileAddress())
-                        if neighbor.tile_size == tile_size:
-                            if not self.contains(neighbor):
-                                ''' new_area.contains(neighbor) in add algo '''
-                                new_area.addTile(neighbor)
-                        else:
-                            direction = neighbor.getEightPointDirectionOfNeighbor(tile)
-                            print(
-                                '\nneighbor:', neighbor.getTileAddress(),
-                                '\nto tile:', tile.getTileAddress(),
-                                f'\n{direction}'
-                            )
-                            neighbor_subtiles = neighbor.returnSetOfBorderSubtiles(desired_tile_size=tile_size, eight_point_direction=direction)
-                            print('len neighbor subs:', len(neighbor_subtiles))
-                            for subtile in neighbor_subtiles:
-                                if not self.contains(neighbor):
-                                    ''' new_area.contains(neighbor) in add algo '''
-                                    new_area.addTile(subtile)
-            self.addTileArea(new_area)
+        ''' grow this area in place by num_of_tiles tiles of tile_size, see {@link #getDilatedTileArea} '''
+        self.addTileArea(self.getDilatedTileArea(num_of_tiles, tile_size))
 
 class SimpleTileArea(TileArea):
     '''/**
@@ -314,46 +579,186 @@ class SimpleTileArea(TileArea):
         larger tiles will contain smaller tiles, but they will be redundant
     '''
     def __init__(self, tile_set=set()):
-        self.smallestTileSize = TileSize.GLOBAL
         super().__init__(tile_set)
 
 
-    def addNonContainedTile(self, newTile, convert_to_shortest_covering_tile_set=False):
-        self.tile_set.add(newTile)
-        if newTile.getTileSize().getCodeLength() > self.smallestTileSize.getCodeLength():
-            self.smallestTileSize = newTile.getTileSize()
-
-    def getSmallestTileSize(self):
-        return self.smallestTileSize
+    def addNonContainedTile(self, newTile):
+        self.addTileToTileSet(newTile)
 
 
-    def contains(self, tile):
-        for memberTile in self.tile_set:
-            if memberTile.contains(tile):
-                return True
-        return False
-
     def getShortestCoveringTileSet(self):
         return self.tile_set
 
 
+class MergingTileArea(TileArea):
+    '''/**
+     * Implements {@link TileArea} in a way that merges smaller tiles added over time into a larger
+     * tile, when possible. Generally, this is the case if all 400 (20x20) subtiles have been added.
+     * This threshold can be lowered.
+    */'''
+    def __init__(self, tile_set=set(), subtiles_per_tile=MAX_SUBTILES_PER_TILE, max_allowed_tile_size=TileSize.GLOBAL):
+        '''
+        @param subtiles_per_tile number of subtiles that get merged into their parent tile, clamped
+        to MIN_SUBTILES_PER_TILE..MAX_SUBTILES_PER_TILE; below 400 the area grows beyond the added tiles
+        @param max_allowed_tile_size tiles of this size or bigger are never merged any further
+        '''
+        self.subtiles_per_tile = min(max(subtiles_per_tile, MIN_SUBTILES_PER_TILE), MAX_SUBTILES_PER_TILE)
+        self.max_allowed_tile_size = max_allowed_tile_size
+        super().__init__(tile_set)
 
 
+class RowIntervalTileArea():
+    '''
+    An area made of tiles of a single tile size, stored per row of the tile grid (see
+    OpenGeoTile.getGridCoordinates()) as sorted, inclusive intervals of columns, as returned by
+    {@link return_row_intervals_of_grid_coordinates}. Memory and the cost of area-wide operations
+    depend on the number of these runs instead of the number of tiles, which suits irregular areas
+    that don't collapse into complete groups of subtiles.
+    '''
+    def __init__(self, row_intervals=None, tile_size=TileSize.PINPOINT):
+        '''
+        @param row_intervals dict of row -> list of inclusive (first column, last column) intervals;
+        intervals may overlap and don't need to be sorted
+        @param tile_size the size of all tiles of this area
+        '''
+        if row_intervals is None:
+            row_intervals = {}
+        self.row_intervals = {row: return_merged_intervals(intervals)
+                              for row, intervals in sorted(row_intervals.items()) if intervals}
+        ''' the rows with intervals, sorted, to find those inside a tile by bisection '''
+        self.rows = list(self.row_intervals)
+        self.tile_size = tile_size
+
+    @classmethod
+    def fromTileArea(cls, tileArea, tile_size=TileSize.PINPOINT):
+        '''
+        Convert the hierarchical covering of a TileArea. Member tiles smaller than tile_size are
+        replaced by the tile of tile_size containing them.
+        '''
+        code_length = tile_size.getCodeLength()
+        row_intervals = {}
+        for tile in tileArea.tile_set:
+            tile_address = tile.getTileAddress()[:code_length]
+            span = ENCODING_BASE ** ((code_length - len(tile_address)) // 2)
+            row, column = return_grid_coordinates_of_address(tile_address)
+            for spanned_row in range(row * span, (row + 1) * span):
+                row_intervals.setdefault(spanned_row, []).append((column * span, (column + 1) * span - 1))
+        return cls(row_intervals, tile_size)
+
+    def toTileArea(self):
+        ''' @return a TileArea with the shortest covering of this area '''
+        return TileArea(set()).union(self)
+
+    def getTileSize(self):
+        return self.tile_size
+
+    def getRunCount(self):
+        ''' number of column intervals stored for this area '''
+        return sum(len(intervals) for intervals in self.row_intervals.values())
+
+    def getTileCount(self):
+        ''' number of tiles of this area's tile size in this area '''
+        return sum(end - start + 1 for intervals in self.row_intervals.values() for start, end in intervals)
+
+    def iterateTileAddresses(self):
+        ''' addresses of all tiles of this area, south to north and west to east '''
+        for row, intervals in self.row_intervals.items():
+            for start, end in intervals:
+                for column in range(start, end + 1):
+                    yield return_address_of_grid_coordinates(row, column, self.tile_size)
+
+    def containsTileAddress(self, tile_address):
+        '''
+        Check if the tile at tile_address is completely inside this area; tiles smaller than this
+        area's tile size are inside if the tile of that size containing them is.
+        '''
+        code_length = self.tile_size.getCodeLength()
+        tile_address = tile_address[:code_length]
+        span = ENCODING_BASE ** ((code_length - len(tile_address)) // 2)
+        row, column = return_grid_coordinates_of_address(tile_address)
+        first_column, last_column = column * span, (column + 1) * span - 1
+        for spanned_row in range(row * span, (row + 1) * span):
+            intervals = self.row_intervals.get(spanned_row)
+            if not intervals:
+                return False
+            ''' the last interval starting at or before first_column, whatever its end '''
+            index = bisect.bisect_right(intervals, (first_column, math.inf)) - 1
+            if index < 0 or intervals[index][1] < last_column:
+                return False
+        return True
 
+    def contains(self, tile):
+        ''' see TileArea.contains() '''
+        return self.containsTileAddress(tile.getTileAddress())
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    def containsLatLong(self, lat, long):
+        ''' see TileArea.containsLatLong() '''
+        return self.containsTileAddress(olc.encode(lat, long, self.tile_size.getCodeLength()).replace(SEPARATOR, ''))
+
+    def returnRowIntervalsOf(self, otherTileArea):
+        ''' row intervals of a RowIntervalTileArea of the same tile size or any TileArea '''
+        if not isinstance(otherTileArea, RowIntervalTileArea):
+            otherTileArea = RowIntervalTileArea.fromTileArea(otherTileArea, self.tile_size)
+        if otherTileArea.getTileSize() != self.tile_size:
+            raise Exception("Tile sizes don't match")
+        return otherTileArea.row_intervals
+
+    def union(self, otherTileArea):
+        ''' @return a new RowIntervalTileArea covering the area of this or otherTileArea '''
+        other_row_intervals = self.returnRowIntervalsOf(otherTileArea)
+        row_intervals = {row: intervals + other_row_intervals.get(row, [])
+                         for row, intervals in self.row_intervals.items()}
+        for row, intervals in other_row_intervals.items():
+            row_intervals.setdefault(row, intervals)
+        return RowIntervalTileArea(row_intervals, self.tile_size)
+
+    def intersection(self, otherTileArea):
+        ''' @return a new RowIntervalTileArea covering the area of both this and otherTileArea '''
+        other_row_intervals = self.returnRowIntervalsOf(otherTileArea)
+        return RowIntervalTileArea({row: return_intersected_intervals(intervals, other_row_intervals[row])
+                                    for row, intervals in self.row_intervals.items()
+                                    if row in other_row_intervals}, self.tile_size)
+
+    def getSubtileCoverage(self, tile_address):
+        '''
+        The subtiles of tile_address (the GLOBAL tiles for '') overlapping this area, see
+        TileArea.getSubtileCoverage(). Only the rows and intervals inside tile_address are visited.
+        @return a dict of address character pair -> True if that subtile is completely inside this area
+        '''
+        depth = (self.tile_size.getCodeLength() - len(tile_address)) // 2
+        if depth <= 0:
+            return {}
+        ''' rows and columns of self.tile_size per subtile '''
+        subtile_span = ENCODING_BASE ** (depth - 1)
+        if tile_address:
+            row, column = return_grid_coordinates_of_address(tile_address)
+            subtile_rows, subtile_columns = ENCODING_BASE, ENCODING_BASE
+        else:
+            row, column = 0, 0
+            subtile_rows, subtile_columns = LATITUDE_FIRST_DIGIT_COUNT, LONGITUDE_FIRST_DIGIT_COUNT
+        first_row = row * subtile_rows * subtile_span
+        first_column = column * subtile_columns * subtile_span
+        last_row = first_row + subtile_rows * subtile_span - 1
+        last_column = first_column + subtile_columns * subtile_span - 1
+
+        touched_subtiles = set()
+        covered_row_counts = {}
+        for row_index in range(bisect.bisect_left(self.rows, first_row), bisect.bisect_right(self.rows, last_row)):
+            grid_row = self.rows[row_index]
+            intervals = self.row_intervals[grid_row]
+            subtile_row = (grid_row - first_row) // subtile_span
+            index = bisect.bisect_right(intervals, (first_column, last_column))
+            if index > 0 and intervals[index - 1][1] >= first_column:
+                index -= 1
+            while index < len(intervals) and intervals[index][0] <= last_column:
+                start = max(intervals[index][0], first_column) - first_column
+                end = min(intervals[index][1], last_column) - first_column
+                for subtile_column in range(start // subtile_span, end // subtile_span + 1):
+                    touched_subtiles.add((subtile_row, subtile_column))
+                ''' subtiles whose columns are all inside the interval '''
+                for subtile_column in range(-(-start // subtile_span), (end + 1) // subtile_span):
+                    covered_row_counts[subtile_row, subtile_column] = covered_row_counts.get((subtile_row, subtile_column), 0) + 1
+                index += 1
+        return {CODE_ALPHABET[subtile_row] + CODE_ALPHABET[subtile_column]:
+                    covered_row_counts.get((subtile_row, subtile_column), 0) == subtile_span
+                for subtile_row, subtile_column in touched_subtiles}
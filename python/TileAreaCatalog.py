@@ -0,0 +1,277 @@
+from openlocationcode import openlocationcode as olc
+from OpenGeoTile import TileSize, SEPARATOR, TILE_SIZE_BY_CODE_LENGTH
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import csv
+import itertools
+
+''' locations read, encoded and joined at once by join_point_file() '''
+DEFAULT_JOIN_CHUNK_SIZE = 100000
+''' in parallel joins, chunks submitted to the process pool per worker before waiting for results '''
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+class TileAreaCatalog():
+    '''
+    An inverted index over many {@link TileArea} objects, each registered under an area id, to
+    find all areas containing a location or tile without asking every area separately.
+
+    The index maps the address of every member tile of every area to the ids of the areas it
+    belongs to. A tile is inside an area if its own address or one of its prefixes is a member
+    tile of that area, so a lookup takes at most five hash lookups, one per tile size.
+
+    To use:
+    catalog = TileAreaCatalog()
+    catalog.addTileArea("zone-1", tile_area)
+    catalog.getAreaIdsOfLatLong(lat, long)     # {"zone-1"} or set()
+    '''
+    def __init__(self, tile_areas=None):
+        '''
+        @param tile_areas optional {area_id: TileArea} to add right away
+        '''
+        self.area_ids_by_address = {}
+        ''' the indexed member tile addresses of each area, to remove an area again even if the
+            TileArea object has changed since '''
+        self.addresses_by_area_id = {}
+        ''' number of indexed addresses per code length; lookups skip code lengths without any '''
+        self.address_counts_by_code_length = {}
+        if tile_areas is not None:
+            for area_id, tileArea in tile_areas.items():
+                self.addTileArea(area_id, tileArea)
+
+    def __len__(self):
+        return len(self.addresses_by_area_id)
+
+    def __contains__(self, area_id):
+        return area_id in self.addresses_by_area_id
+
+    def getAreaIds(self):
+        ''' ids of all areas in this catalog '''
+        return set(self.addresses_by_area_id)
+
+    def addTileArea(self, area_id, tileArea):
+        '''
+        Add an area to the catalog, replacing an area with the same id. The catalog keeps a copy of
+        the area's member tile addresses; later changes to tileArea need to be added again.
+        @param area_id any hashable id, e.g. a name
+        @param tileArea a TileArea
+        '''
+        if area_id in self.addresses_by_area_id:
+            self.removeTileArea(area_id)
+        member_addresses = {tile.getTileAddress() for tile in tileArea.tile_set}
+        ''' members inside other members (possible for a SimpleTileArea) would match twice '''
+        tile_addresses = {tile_address for tile_address in member_addresses
+                          if not any(tile_address[:prefix_length] in member_addresses
+                                     for prefix_length in range(2, len(tile_address), 2))}
+        self.addresses_by_area_id[area_id] = tile_addresses
+        for tile_address in tile_addresses:
+            area_ids = self.area_ids_by_address.get(tile_address)
+            if area_ids is None:
+                self.area_ids_by_address[tile_address] = {area_id}
+                code_length = len(tile_address)
+                self.address_counts_by_code_length[code_length] = self.address_counts_by_code_length.get(code_length, 0) + 1
+            else:
+                area_ids.add(area_id)
+
+    def removeTileArea(self, area_id):
+        '''
+        Remove an area from the catalog; only the index entries of its member tiles are touched.
+        @throws Exception if there is no area with this id
+        '''
+        if area_id not in self.addresses_by_area_id:
+            raise Exception("No TileArea with this id in catalog")
+        for tile_address in self.addresses_by_area_id.pop(area_id):
+            area_ids = self.area_ids_by_address[tile_address]
+            area_ids.discard(area_id)
+            if not area_ids:
+                del self.area_ids_by_address[tile_address]
+                code_length = len(tile_address)
+                self.address_counts_by_code_length[code_length] -= 1
+                if self.address_counts_by_code_length[code_length] == 0:
+                    del self.address_counts_by_code_length[code_length]
+
+    def getSmallestTileSize(self):
+        ''' the smallest tile size used by any area of this catalog; GLOBAL for an empty catalog '''
+        if not self.address_counts_by_code_length:
+            return TileSize.GLOBAL
+        return TILE_SIZE_BY_CODE_LENGTH[max(self.address_counts_by_code_length)]
+
+    def getAreaIdsOfTileAddress(self, tile_address):
+        ''' ids of all areas completely containing the tile with this address '''
+        area_ids = set()
+        for code_length in self.address_counts_by_code_length:
+            if code_length <= len(tile_address):
+                prefix_area_ids = self.area_ids_by_address.get(tile_address[:code_length])
+                if prefix_area_ids:
+                    area_ids |= prefix_area_ids
+        return area_ids
+
+    def getAreaIdsOfTile(self, tile):
+        ''' ids of all areas completely containing the OpenGeoTile tile '''
+        return self.getAreaIdsOfTileAddress(tile.getTileAddress())
+
+    def getAreaIdsOfLatLong(self, lat, long):
+        ''' ids of all areas containing the location, see {@link TileArea#containsLatLong} '''
+        tile_address = olc.encode(lat, long, TileSize.PINPOINT.getCodeLength()).replace(SEPARATOR, '')
+        return self.getAreaIdsOfTileAddress(tile_address)
+
+    def returnPointAreaPairs(self, lats, longs):
+        '''
+        Batch version of {@link #getAreaIdsOfLatLong} for NumPy arrays (needs NumPy, see
+        TileArrays). Locations are encoded in one vectorized pass, and the index is looked up once
+        per distinct address prefix instead of once per location.
+        @param lats 1-dimensional array-like of latitudes
+        @param longs array-like of longitudes, same shape as lats
+        @return (point_indices, area_ids): an int64 array of positions in lats/longs and a list of
+        the same length with an area containing that location, ordered by position
+        '''
+        import TileArrays
+        np = TileArrays.np
+        tile_addresses = TileArrays.encode_tiles(lats, longs, self.getSmallestTileSize())
+        if tile_addresses.ndim != 1:
+            raise Exception("Latitude and longitude arrays must be 1-dimensional")
+        point_index_arrays = []
+        area_ids = []
+        for code_length in sorted(self.address_counts_by_code_length):
+            prefixes, inverse = np.unique(tile_addresses.astype(f'U{code_length}'), return_inverse=True)
+            ''' positions of the locations sharing each prefix, as slices of one sorted array '''
+            point_order = np.argsort(inverse.ravel(), kind='stable')
+            ends = np.cumsum(np.bincount(inverse.ravel(), minlength=len(prefixes))).tolist()
+            for k, prefix in enumerate(prefixes.tolist()):
+                prefix_area_ids = self.area_ids_by_address.get(prefix)
+                if not prefix_area_ids:
+                    continue
+                point_indices = point_order[(ends[k - 1] if k else 0):ends[k]]
+                for area_id in prefix_area_ids:
+                    point_index_arrays.append(point_indices)
+                    area_ids.extend([area_id] * len(point_indices))
+        if not point_index_arrays:
+            return np.zeros(0, dtype=np.int64), []
+        point_indices = np.concatenate(point_index_arrays)
+        order = np.argsort(point_indices, kind='stable')
+        return point_indices[order], [area_ids[i] for i in order.tolist()]
+
+    def getAreaIdsOfLatLongs(self, lats, longs):
+        '''
+        Batch version of {@link #getAreaIdsOfLatLong}, see {@link #returnPointAreaPairs}.
+        @return a list with the set of ids of the areas containing each location
+        '''
+        result = [set() for i in range(len(lats))]
+        point_indices, area_ids = self.returnPointAreaPairs(lats, longs)
+        for point_index, area_id in zip(point_indices.tolist(), area_ids):
+            result[point_index].add(area_id)
+        return result
+
+
+def iterate_point_chunks(input_path, chunk_size=DEFAULT_JOIN_CHUNK_SIZE,
+                         latitude_column='latitude', longitude_column='longitude'):
+    '''
+    Read locations from a file in chunks, without loading the whole file.
+    @param input_path a CSV file with a header row, or a .npy file holding an (n, 2) array of
+                      latitude/longitude pairs, which is memory-mapped
+    @param latitude_column, longitude_column names of the CSV columns holding the locations
+    @return an iterator of (first_index, lats, longs), first_index being the position of the
+    chunk's first location in the file (counting data rows only) and lats/longs float64 arrays
+    '''
+    import TileArrays
+    np = TileArrays.np
+    if str(input_path).endswith('.npy'):
+        points = np.load(input_path, mmap_mode='r')
+        if points.ndim != 2 or points.shape[1] != 2:
+            raise Exception("Point array must have the shape (n, 2)")
+        for first_index in range(0, len(points), chunk_size):
+            chunk = np.asarray(points[first_index:first_index + chunk_size], dtype=np.float64)
+            yield first_index, chunk[:, 0].copy(), chunk[:, 1].copy()
+        return
+
+    with open(input_path, newline='') as input_file:
+        reader = csv.reader(input_file)
+        header = next(reader, None)
+        if header is None or latitude_column not in header or longitude_column not in header:
+            raise Exception("CSV file needs a header with the latitude and longitude columns")
+        latitude_position = header.index(latitude_column)
+        longitude_position = header.index(longitude_column)
+        first_index = 0
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                return
+            lats = np.array([row[latitude_position] for row in rows], dtype=np.float64)
+            longs = np.array([row[longitude_position] for row in rows], dtype=np.float64)
+            yield first_index, lats, longs
+            first_index += len(rows)
+
+
+''' the catalog of a worker process of iterate_joined_chunks() '''
+_worker_catalog = None
+
+
+def _initialize_join_worker(catalog):
+    global _worker_catalog
+    _worker_catalog = catalog
+
+
+def return_joined_chunk(point_chunk):
+    ''' join one chunk of iterate_point_chunks() in a worker process, see iterate_joined_chunks() '''
+    first_index, lats, longs = point_chunk
+    point_indices, area_ids = _worker_catalog.returnPointAreaPairs(lats, longs)
+    return point_indices + first_index, area_ids
+
+
+def iterate_joined_chunks(catalog, point_chunks, max_workers=None):
+    '''
+    Join chunks of locations against the areas of a catalog.
+    @param catalog a TileAreaCatalog; in parallel mode, it is sent to each worker once and must not
+                   be changed while joining
+    @param point_chunks an iterable of (first_index, lats, longs), see iterate_point_chunks()
+    @param max_workers number of worker processes; None or 1 to join in this process
+    @return an iterator of (point_indices, area_ids) per chunk, in the order of point_chunks, see
+    {@link TileAreaCatalog#returnPointAreaPairs}; point indices are offset by first_index
+    '''
+    if max_workers is None or max_workers <= 1:
+        for first_index, lats, longs in point_chunks:
+            point_indices, area_ids = catalog.returnPointAreaPairs(lats, longs)
+            yield point_indices + first_index, area_ids
+        return
+
+    ''' only a few chunks are in flight at any time, so memory stays bounded for any input size;
+        results are collected in submission order, so the output matches the serial one '''
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize_join_worker,
+                             initargs=(catalog,)) as executor:
+        futures = deque()
+        for point_chunk in point_chunks:
+            futures.append(executor.submit(return_joined_chunk, point_chunk))
+            if len(futures) >= max_workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
+def join_point_file(catalog, input_path, output_path, chunk_size=DEFAULT_JOIN_CHUNK_SIZE, max_workers=None,
+                    latitude_column='latitude', longitude_column='longitude'):
+    '''
+    Streaming spatial join of a point file against the areas of a catalog. Locations are read,
+    encoded and joined chunk by chunk, and the matches are written to output_path as they come.
+    @param catalog a TileAreaCatalog
+    @param input_path a CSV or .npy point file, see iterate_point_chunks()
+    @param output_path the CSV file to write, with one "point_index,area_id" row per location and
+                       area containing it, ordered by point_index
+    @param max_workers number of worker processes, see iterate_joined_chunks()
+    @return (number of locations read, number of rows written)
+    '''
+    point_count = 0
+    match_count = 0
+
+    def iterate_counted_chunks():
+        nonlocal point_count
+        for point_chunk in iterate_point_chunks(input_path, chunk_size, latitude_column, longitude_column):
+            point_count += len(point_chunk[1])
+            yield point_chunk
+
+    with open(output_path, 'w', newline='') as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(['point_index', 'area_id'])
+        for point_indices, area_ids in iterate_joined_chunks(catalog, iterate_counted_chunks(), max_workers):
+            writer.writerows(zip(point_indices.tolist(), area_ids))
+            match_count += len(area_ids)
+    return point_count, match_count
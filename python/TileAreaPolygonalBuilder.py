@@ -0,0 +1,305 @@
+from OpenGeoTile import (TileSize, CODE_ALPHABET, ENCODING_BASE, LATITUDE_FIRST_DIGIT_COUNT,
+                         LONGITUDE_FIRST_DIGIT_COUNT, TILE_SIZE_BY_CODE_LENGTH,
+                         return_grid_coordinates_of_address, return_tile_of_address)
+from TileArea import MergingTileArea
+from Coordinate import Coordinate
+from concurrent.futures import ProcessPoolExecutor
+import bisect
+import math
+
+''' min/max values for latitude and longitude in degrees '''
+LATITUDE_MIN  =  -90.0
+LONGITUDE_MIN = -180.0
+LATITUDE_MAX  =   90.0
+LONGITUDE_MAX =  180.0
+
+''' tiles are treated as this much bigger when looking for polygon edges crossing them, so that
+    rounding never hides an edge '''
+TILE_MARGIN_DEGREES = 1e-9
+
+
+def segment_intersects_rectangle(edge, south, west, north, east):
+    ''' whether the polygon edge (lat1, long1, lat2, long2) touches the given rectangle '''
+    lat1, long1, lat2, long2 = edge
+    if max(lat1, lat2) < south or min(lat1, lat2) > north or max(long1, long2) < west or min(long1, long2) > east:
+        return False
+    ''' inside the bounding box, the edge misses the rectangle only if all corners are on the same side '''
+    sides = [(long2 - long1) * (lat - lat1) - (lat2 - lat1) * (long - long1)
+             for lat, long in ((south, west), (south, east), (north, west), (north, east))]
+    return not (all(side > 0 for side in sides) or all(side < 0 for side in sides))
+
+
+class ScanlineIndex():
+    '''
+    Polygon edges bucketed by latitude, to find the longitudes at which a scanline (a line of
+    constant latitude) crosses the polygon without looking at all edges.
+    '''
+    def __init__(self, edges):
+        self.south = min(min(edge[0], edge[2]) for edge in edges)
+        north = max(max(edge[0], edge[2]) for edge in edges)
+        self.bucket_count = len(edges)
+        self.bucket_height = (north - self.south) / self.bucket_count or 1.0
+        self.buckets = [[] for i in range(self.bucket_count)]
+        for edge in edges:
+            for bucket in range(self.returnBucket(min(edge[0], edge[2])), self.returnBucket(max(edge[0], edge[2])) + 1):
+                self.buckets[bucket].append(edge)
+
+    def returnBucket(self, latitude):
+        return min(max(int((latitude - self.south) / self.bucket_height), 0), self.bucket_count - 1)
+
+    def returnCrossingLongitudes(self, latitude):
+        '''
+        Sorted longitudes at which the scanline at latitude crosses the polygon; a location is
+        inside the polygon if an odd number of them is west of it (even-odd rule).
+        '''
+        crossing_longitudes = []
+        for lat1, long1, lat2, long2 in self.buckets[self.returnBucket(latitude)]:
+            if (lat1 > latitude) != (lat2 > latitude):
+                crossing_longitudes.append(long1 + (latitude - lat1) / (lat2 - lat1) * (long2 - long1))
+        crossing_longitudes.sort()
+        return crossing_longitudes
+
+
+''' cells of the split tile size handed to a worker process at once '''
+CELLS_PER_TASK = 64
+
+''' per process state of the worker processes covering polygon cells, see build() '''
+_worker_builder = None
+_worker_scanline_index = None
+
+
+def _initialize_polygon_cell_worker(precision, maximum_tile_size, edges):
+    global _worker_builder, _worker_scanline_index
+    _worker_builder = TileAreaPolygonalBuilder().setPrecision(precision).setMaximumTileSize(maximum_tile_size)
+    _worker_scanline_index = ScanlineIndex(edges)
+
+
+def return_tile_addresses_of_polygon_cells(cells):
+    '''
+    Cover the polygon within each of the given (tile_address, edges) cells in a worker process.
+    Returns the addresses of all tiles found inside the polygon.
+    '''
+    cellArea = MergingTileArea(max_allowed_tile_size=_worker_builder.maximumTileSize or TileSize.GLOBAL)
+    for tile_address, edges in cells:
+        _worker_builder.addTilesOfPolygon(cellArea, tile_address, edges, _worker_scanline_index)
+    return [tile.getTileAddress() for tile in cellArea.tile_set]
+
+
+class TileAreaPolygonalBuilder():
+    '''/**
+     * A builder to create a {@link TileArea} from an array of coordinates interpreted as vertices
+     * of a closed polygon.
+     *
+     * To create a TileArea:
+     * coordinates = ...; // list of coordinates goes here
+     * precision = ...;   // precision of resulting area
+     * area = TileAreaPolygonalBuilder()
+     *         .setPrecision(precision)
+     *         .setCoordinatesList(coordinates)
+     *         .build()
+     *
+     * The resulting TileArea can be used to retrieve a list of
+     * {@link com.google.openlocationcode.OpenLocationCode} covering the polygon area.
+    */'''
+    ''' Further rings added with addCoordinatesList() are combined with the even-odd rule: a ring
+        inside another one cuts a hole into it, rings outside of each other form a multipolygon.
+        A tile of the precision size is part of the area if its center is inside the polygon. '''
+    def __init__(self):
+        ''' internal state, updated by set* methods '''
+        self.precision = TileSize.DISTRICT
+        self.maximumTileSize = None
+        self.coordinate_rings = None
+        self.maxWorkers = None
+        self.splitTileSize = TileSize.REGION
+
+    def setPrecision(self, precision):
+        '''/**
+         * Set the minimum tile size of {@link OpenGeoTile} that should be contained
+         * in the resulting {@link TileArea}
+         * @param precision the precision (or minimum size) for elements of the returned TileArea
+         * @return this object, to chain additional setters
+        */'''
+        self.precision = precision
+        return self
+
+    def setMaximumTileSize(self, maximumTileSize):
+        '''/**
+         * Set the maximum tile size of {@link OpenGeoTile} that should be contained
+         * in the resulting {@link TileArea}
+         * @param maximumTileSize the maximum TileSize that should be returned by this builder
+         * @return this object, to chain additional setters
+        */'''
+        self.maximumTileSize = maximumTileSize
+        return self
+
+    def setParallelism(self, maxWorkers, splitTileSize=TileSize.REGION):
+        '''
+        Cover the polygon in up to maxWorkers processes instead of in this one. The polygon is
+        split along the boundaries of tiles of splitTileSize and the cells along its edges are
+        covered by a process pool; the result is identical to building without parallelism.
+        @param maxWorkers number of worker processes; None or 1 to build in this process
+        @param splitTileSize size of the cells handed to the workers, e.g. REGION or DISTRICT
+        @return this object, to chain additional setters
+        '''
+        self.maxWorkers = maxWorkers
+        self.splitTileSize = splitTileSize
+        return self
+
+    def setCoordinatesList(self, coordinates):
+        '''/**
+         * Set an array of coordinates, which will be interpreted as vertices of a closed polygon
+         * @param coordinates a list of {@link Coordinate} or (latitude, longitude) tuples.
+         *                    Coordinates that are not valid latitude/longitude pairs will be
+         *                    dropped, the remaining list needs to contain at least three elements
+         *                    to form a valid polygon. The list is not checked for problems such as
+         *                    self-intersection.
+         * @return this object, to chain additional setters
+        */'''
+        self.coordinate_rings = []
+        return self.addCoordinatesList(coordinates)
+
+    def addCoordinatesList(self, coordinates):
+        '''
+        Add another closed polygon ring, e.g. a hole or another part of a multipolygon, see
+        {@link #setCoordinatesList}.
+        @return this object, to chain additional setters
+        '''
+        if self.coordinate_rings is None:
+            self.coordinate_rings = []
+        ring = []
+        for coordinate in coordinates:
+            if not isinstance(coordinate, Coordinate):
+                coordinate = Coordinate(*coordinate)
+            if (LATITUDE_MIN <= coordinate.latitude() <= LATITUDE_MAX
+                    and LONGITUDE_MIN <= coordinate.longitude() <= LONGITUDE_MAX):
+                ring.append((coordinate.latitude(), coordinate.longitude()))
+            ''' coordinate is invalid else; skip it '''
+        self.coordinate_rings.append(ring)
+        return self
+
+    def isValid(self):
+        '''/**
+         * Checks if building the TileArea now would result in a non-null return value
+         * @return true, if all necessary values have been set; false otherwise
+        */'''
+        if not self.coordinate_rings:
+            ''' coordinates haven't been set '''
+            return False
+
+        if self.precision is None:
+            ''' tile size hasn't been set '''
+            return False
+
+        for ring in self.coordinate_rings:
+            if len(ring) <= 2:
+                ''' can't create polygon with less than 3 coordinates '''
+                return False
+
+        return True
+
+    def returnEdges(self):
+        ''' all polygon edges as (lat1, long1, lat2, long2), each ring closed '''
+        edges = []
+        for ring in self.coordinate_rings:
+            for i in range(len(ring)):
+                edges.append(ring[i - 1] + ring[i])
+        return [edge for edge in edges if edge[0] != edge[2] or edge[1] != edge[3]]
+
+    def build(self):
+        '''/**
+         * Build and return a {@link TileArea}
+         * @return a TileArea corresponding to the closed polygon input, if all vertices of that polygon
+         * are valid lat/long coordinates; a TileArea created from all valid vertices if not; null, if
+         * the state of this builder is not valid
+        */'''
+        ''' return None if TileArea could not be constructed '''
+        if not self.isValid():
+            return None
+
+        if self.maximumTileSize is None:
+            rasterizedArea = MergingTileArea()
+        else:
+            rasterizedArea = MergingTileArea(max_allowed_tile_size=self.maximumTileSize)
+        edges = self.returnEdges()
+        if not edges:
+            return rasterizedArea
+        scanline_index = ScanlineIndex(edges)
+        if self.maxWorkers is None or self.maxWorkers <= 1:
+            self.addTilesOfPolygon(rasterizedArea, '', edges, scanline_index)
+            return rasterizedArea
+
+        ''' cover everything down to the split size here, collecting the cells along the edges '''
+        cells = []
+        self.addTilesOfPolygon(rasterizedArea, '', edges, scanline_index, cells)
+        tasks = [cells[i:i + CELLS_PER_TASK] for i in range(0, len(cells), CELLS_PER_TASK)]
+        with ProcessPoolExecutor(max_workers=self.maxWorkers,
+                                 initializer=_initialize_polygon_cell_worker,
+                                 initargs=(self.precision, self.maximumTileSize, edges)) as executor:
+            for tile_addresses in executor.map(return_tile_addresses_of_polygon_cells, tasks):
+                for tile_address in tile_addresses:
+                    rasterizedArea.addTile(return_tile_of_address(tile_address))
+        return rasterizedArea
+
+    def addTilesOfPolygon(self, rasterizedArea, tile_address, edges, scanline_index, split_cells=None):
+        '''
+        Add the subtiles of tile_address ('' for the whole globe) that are inside the polygon.
+        Subtiles no edge passes through are entirely inside or outside and get added as a whole;
+        only subtiles along the polygon boundary are split further, down to the precision size.
+        @param edges the polygon edges passing through tile_address
+        @param split_cells if given, subtiles of the split tile size along the polygon boundary
+                           are appended to it as (tile_address, edges) instead of being split
+        '''
+        if tile_address:
+            row, column = return_grid_coordinates_of_address(tile_address)
+            subtile_rows, subtile_columns = ENCODING_BASE, ENCODING_BASE
+        else:
+            row, column = 0, 0
+            subtile_rows, subtile_columns = LATITUDE_FIRST_DIGIT_COUNT, LONGITUDE_FIRST_DIGIT_COUNT
+        subtile_size = TILE_SIZE_BY_CODE_LENGTH[len(tile_address) + 2]
+        increment = subtile_size.getCoordinateIncrement()
+        south = LATITUDE_MIN + row * subtile_rows * increment
+        west = LONGITUDE_MIN + column * subtile_columns * increment
+
+        ''' the subtiles each edge passes through, looking only at those in its bounding box '''
+        edges_by_subtile = {}
+        for edge in edges:
+            first_row = max(math.floor((min(edge[0], edge[2]) - south - TILE_MARGIN_DEGREES) / increment), 0)
+            last_row = min(math.floor((max(edge[0], edge[2]) - south + TILE_MARGIN_DEGREES) / increment), subtile_rows - 1)
+            first_column = max(math.floor((min(edge[1], edge[3]) - west - TILE_MARGIN_DEGREES) / increment), 0)
+            last_column = min(math.floor((max(edge[1], edge[3]) - west + TILE_MARGIN_DEGREES) / increment), subtile_columns - 1)
+            for subtile_row in range(first_row, last_row + 1):
+                for subtile_column in range(first_column, last_column + 1):
+                    if segment_intersects_rectangle(edge,
+                                                    south + subtile_row * increment - TILE_MARGIN_DEGREES,
+                                                    west + subtile_column * increment - TILE_MARGIN_DEGREES,
+                                                    south + (subtile_row + 1) * increment + TILE_MARGIN_DEGREES,
+                                                    west + (subtile_column + 1) * increment + TILE_MARGIN_DEGREES):
+                        edges_by_subtile.setdefault((subtile_row, subtile_column), []).append(edge)
+
+        at_precision = subtile_size == self.precision
+        split_here = split_cells is not None and subtile_size == self.splitTileSize
+        for subtile_row in range(subtile_rows):
+            center_latitude = south + (subtile_row + 0.5) * increment
+            crossing_longitudes = scanline_index.returnCrossingLongitudes(center_latitude)
+            for subtile_column in range(subtile_columns):
+                subtile_address = tile_address + CODE_ALPHABET[subtile_row] + CODE_ALPHABET[subtile_column]
+                subtile_edges = edges_by_subtile.get((subtile_row, subtile_column))
+                if subtile_edges and not at_precision:
+                    if split_here:
+                        split_cells.append((subtile_address, subtile_edges))
+                    else:
+                        self.addTilesOfPolygon(rasterizedArea, subtile_address, subtile_edges,
+                                               scanline_index, split_cells)
+                    continue
+                center_longitude = west + (subtile_column + 0.5) * increment
+                if bisect.bisect_left(crossing_longitudes, center_longitude) % 2 == 1:
+                    self.addWholeTile(rasterizedArea, subtile_address)
+
+    def addWholeTile(self, rasterizedArea, tile_address):
+        ''' add a tile inside the polygon, split into tiles of the maximum tile size if necessary '''
+        tile = return_tile_of_address(tile_address)
+        if self.maximumTileSize is None or len(tile_address) >= self.maximumTileSize.getCodeLength():
+            rasterizedArea.addTile(tile)
+        else:
+            for subtile_address in tile.iterateSubtileAddresses(self.maximumTileSize):
+                rasterizedArea.addTile(return_tile_of_address(subtile_address))
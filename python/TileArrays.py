@@ -0,0 +1,327 @@
+from openlocationcode import openlocationcode as olc
+from OpenGeoTile import (OpenGeoTile, TileSize, CODE_ALPHABET, ENCODING_BASE, LONGITUDE_FIRST_DIGIT_COUNT,
+                         TILE_ID_LEVEL_BITS, TILE_ID_DIGIT_BITS, TILE_ID_DIGIT_MASK, TILE_SIZE_BY_CODE_LENGTH,
+                         return_grid_dimensions)
+from collections import namedtuple
+import numpy as np
+
+'''
+    Batch versions of OpenGeoTile operations on NumPy arrays.
+
+    Tiles are passed around either as tile addresses (NumPy unicode arrays) or as packed tile ids
+    (int64 arrays, see OpenGeoTile.PackedTile); all digits are computed with vectorized integer
+    arithmetic instead of constructing one OpenGeoTile per element.
+'''
+
+''' olc.encode works on integers in units of 1/FINAL_LAT_PRECISION_ and 1/FINAL_LNG_PRECISION_
+    degrees; a PINPOINT tile spans this many of those units '''
+PINPOINT_LATITUDE_UNITS = olc.GRID_ROWS_ ** olc.GRID_CODE_LENGTH_
+PINPOINT_LONGITUDE_UNITS = olc.GRID_COLUMNS_ ** olc.GRID_CODE_LENGTH_
+PINPOINT_LEVEL = TileSize.PINPOINT.getCodeLength() // 2
+
+CODE_ALPHABET_BYTES = np.frombuffer(CODE_ALPHABET.encode('ascii'), dtype=np.uint8)
+''' maps ASCII codes (upper and lower case) to alphabet indices, -1 for invalid characters '''
+CODE_ALPHABET_LOOKUP = np.full(256, -1, dtype=np.int64)
+CODE_ALPHABET_LOOKUP[CODE_ALPHABET_BYTES] = np.arange(len(CODE_ALPHABET))
+CODE_ALPHABET_LOOKUP[np.frombuffer(CODE_ALPHABET.lower().encode('ascii'), dtype=np.uint8)] = np.arange(len(CODE_ALPHABET))
+
+''' bounds and centers of decoded tiles as float64 arrays, named after the edges of a tile '''
+TileBounds = namedtuple('TileBounds', ['south', 'west', 'north', 'east', 'latitude_center', 'longitude_center'])
+
+
+def return_grid_coordinate_arrays_of_lat_long(lats, longs, tile_size=TileSize.PINPOINT):
+    '''
+    Vectorized equivalent of OpenGeoTile(lat=..., long=..., tile_size=...).getGridCoordinates():
+    latitudes are clipped and longitudes normalized the same way as in olc.encode.
+    @return (rows, columns) as int64 arrays
+    '''
+    lats = np.asarray(lats, dtype=np.float64)
+    longs = np.asarray(longs, dtype=np.float64)
+    if lats.shape != longs.shape:
+        raise Exception("Latitude and longitude arrays must have the same shape")
+    if not (np.isfinite(lats).all() and np.isfinite(longs).all()):
+        raise Exception("Latitude and longitude values must be finite")
+
+    lats = np.clip(lats, -olc.LATITUDE_MAX_, olc.LATITUDE_MAX_)
+    ''' latitude 90 needs to be adjusted to be just less, as in olc.encode '''
+    lats = np.where(lats == olc.LATITUDE_MAX_,
+                    olc.LATITUDE_MAX_ - olc.computeLatitudePrecision(tile_size.getCodeLength()),
+                    lats)
+    out_of_range = (longs < -olc.LONGITUDE_MAX_) | (longs >= olc.LONGITUDE_MAX_)
+    if out_of_range.any():
+        wraps = np.floor((longs + olc.LONGITUDE_MAX_) / (2 * olc.LONGITUDE_MAX_))
+        longs = np.where(out_of_range, longs - wraps * (2 * olc.LONGITUDE_MAX_), longs)
+
+    ''' same rounding as olc.encode before truncating to integers '''
+    lat_values = np.round((lats + olc.LATITUDE_MAX_) * olc.FINAL_LAT_PRECISION_, 6).astype(np.int64)
+    long_values = np.round((longs + olc.LONGITUDE_MAX_) * olc.FINAL_LNG_PRECISION_, 6).astype(np.int64)
+
+    scale = ENCODING_BASE ** (PINPOINT_LEVEL - tile_size.getCodeLength() // 2)
+    rows = lat_values // (PINPOINT_LATITUDE_UNITS * scale)
+    columns = long_values // (PINPOINT_LONGITUDE_UNITS * scale)
+    return rows, columns
+
+
+def return_tile_id_array_of_grid_coordinates(rows, columns, tile_size):
+    ''' packed tile ids (int64) of tiles of tile_size at the given grid coordinates '''
+    rows = np.asarray(rows, dtype=np.int64)
+    columns = np.asarray(columns, dtype=np.int64)
+    level = tile_size.getCodeLength() // 2
+    tile_ids = np.zeros(rows.shape, dtype=np.int64)
+    for i in range(level):
+        place_value = ENCODING_BASE ** (level - 1 - i)
+        row_digits = (rows // place_value) % ENCODING_BASE
+        column_digits = (columns // place_value) % ENCODING_BASE
+        tile_ids = (tile_ids << TILE_ID_DIGIT_BITS) | row_digits
+        tile_ids = (tile_ids << TILE_ID_DIGIT_BITS) | column_digits
+    unused_characters = TileSize.PINPOINT.getCodeLength() - tile_size.getCodeLength()
+    tile_ids <<= TILE_ID_DIGIT_BITS * unused_characters
+    return (tile_ids << TILE_ID_LEVEL_BITS) | level
+
+
+def return_address_array_of_tile_ids(tile_ids, tile_size):
+    ''' tile addresses (unicode array) of packed tile ids that all belong to tiles of tile_size '''
+    tile_ids = np.asarray(tile_ids, dtype=np.int64)
+    code_length = tile_size.getCodeLength()
+    full_length = TileSize.PINPOINT.getCodeLength()
+    characters = np.empty(tile_ids.shape + (code_length,), dtype=np.uint8)
+    for i in range(code_length):
+        shift = TILE_ID_LEVEL_BITS + TILE_ID_DIGIT_BITS * (full_length - 1 - i)
+        characters[..., i] = CODE_ALPHABET_BYTES[(tile_ids >> shift) & TILE_ID_DIGIT_MASK]
+    return np.ascontiguousarray(characters).view(f'S{code_length}')[..., 0].astype(f'U{code_length}')
+
+
+def encode_tiles(lats, longs, tile_size=TileSize.PINPOINT, return_tile_ids=False):
+    '''
+    Encode arrays of locations to the tiles of tile_size containing them, equivalent to calling
+    OpenGeoTile(lat=lat, long=long, tile_size=tile_size) per element.
+    @param lats array-like of latitudes
+    @param longs array-like of longitudes, same shape as lats
+    @param tile_size the TileSize of the resulting tiles
+    @param return_tile_ids if True, return packed tile ids instead of tile addresses
+    @return an array of tile addresses, or an int64 array of packed tile ids
+    '''
+    rows, columns = return_grid_coordinate_arrays_of_lat_long(lats, longs, tile_size)
+    tile_ids = return_tile_id_array_of_grid_coordinates(rows, columns, tile_size)
+    if return_tile_ids:
+        return tile_ids
+    return return_address_array_of_tile_ids(tile_ids, tile_size)
+
+
+def return_prefix_tile_id_array(tile_ids, tile_size):
+    '''
+    Packed ids of the tiles of tile_size containing the given tiles, equivalent to shortening each
+    tile address to tile_size. All tile_ids need to be of tile_size or smaller.
+    '''
+    tile_ids = np.asarray(tile_ids, dtype=np.int64)
+    code_length = tile_size.getCodeLength()
+    prefix_shift = TILE_ID_LEVEL_BITS + TILE_ID_DIGIT_BITS * (TileSize.PINPOINT.getCodeLength() - code_length)
+    return ((tile_ids >> prefix_shift) << prefix_shift) | (code_length // 2)
+
+
+def return_contained_mask(tile_ids, member_tile_ids_by_size):
+    '''
+    Whether each of the given tiles is contained in one of the member tiles, using a sorted search
+    per member tile size instead of comparing every pair.
+    @param tile_ids packed tile ids, all at least as small as the smallest member tile size
+    @param member_tile_ids_by_size {TileSize: sorted int64 array of member tile ids of that size}
+    @return a boolean array with the shape of tile_ids
+    '''
+    tile_ids = np.asarray(tile_ids, dtype=np.int64)
+    mask = np.zeros(tile_ids.shape, dtype=bool)
+    for tile_size, member_tile_ids in member_tile_ids_by_size.items():
+        if len(member_tile_ids) == 0:
+            continue
+        prefix_ids = return_prefix_tile_id_array(tile_ids, tile_size)
+        positions = np.minimum(np.searchsorted(member_tile_ids, prefix_ids), len(member_tile_ids) - 1)
+        mask |= member_tile_ids[positions] == prefix_ids
+    return mask
+
+
+def return_tile_id_array_of_addresses(tile_addresses):
+    '''
+    Packed tile ids (int64) of an array of tile addresses. Addresses may be of different sizes.
+    @throws Exception if any element is not a valid tile address
+    '''
+    tile_addresses = np.asarray(tile_addresses)
+    if tile_addresses.dtype.kind not in 'US':
+        tile_addresses = tile_addresses.astype('U')
+    full_length = TileSize.PINPOINT.getCodeLength()
+    lengths = np.char.str_len(tile_addresses)
+    if not np.isin(lengths, [tile_size.getCodeLength() for tile_size in TileSize]).all():
+        raise Exception("Invalid tile address")
+    characters = np.ascontiguousarray(tile_addresses.astype(f'S{full_length}'))
+    characters = characters.view(np.uint8).reshape(tile_addresses.shape + (full_length,))
+    digits = CODE_ALPHABET_LOOKUP[characters]
+    used_characters = np.arange(full_length) < lengths[..., np.newaxis]
+    if (digits[used_characters] < 0).any():
+        raise Exception("Character does not exist in alphabet")
+    digits = np.where(used_characters, digits, 0)
+    tile_ids = np.zeros(tile_addresses.shape, dtype=np.int64)
+    for i in range(full_length):
+        tile_ids = (tile_ids << TILE_ID_DIGIT_BITS) | digits[..., i]
+    return (tile_ids << TILE_ID_LEVEL_BITS) | (lengths // 2)
+
+
+def return_tile_id_array(tiles):
+    ''' packed tile ids of an array of tile addresses or packed tile ids '''
+    tiles = np.asarray(tiles)
+    if tiles.dtype.kind in 'iu':
+        return tiles.astype(np.int64)
+    return return_tile_id_array_of_addresses(tiles)
+
+
+def return_grid_coordinate_arrays_of_tile_ids(tile_ids):
+    '''
+    Grid coordinates of packed tile ids, see OpenGeoTile.getGridCoordinates(). Each tile is placed
+    in the grid of its own size, so ids of different sizes may be mixed.
+    @return (rows, columns, levels) as int64 arrays; the level is the code length / 2
+    '''
+    tile_ids = np.asarray(tile_ids, dtype=np.int64)
+    levels = tile_ids & ((1 << TILE_ID_LEVEL_BITS) - 1)
+    if not ((levels >= 1) & (levels <= PINPOINT_LEVEL)).all():
+        raise Exception("Invalid tile id")
+    rows = np.zeros(tile_ids.shape, dtype=np.int64)
+    columns = np.zeros(tile_ids.shape, dtype=np.int64)
+    full_length = TileSize.PINPOINT.getCodeLength()
+    for i in range(0, full_length, 2):
+        row_shift = TILE_ID_LEVEL_BITS + TILE_ID_DIGIT_BITS * (full_length - 1 - i)
+        rows = rows * ENCODING_BASE + ((tile_ids >> row_shift) & TILE_ID_DIGIT_MASK)
+        columns = columns * ENCODING_BASE + ((tile_ids >> (row_shift - TILE_ID_DIGIT_BITS)) & TILE_ID_DIGIT_MASK)
+    scales = ENCODING_BASE ** (PINPOINT_LEVEL - levels)
+    return rows // scales, columns // scales, levels
+
+
+def decode_tiles(tiles):
+    '''
+    Decode an array of tiles to their bounding boxes and centers in one pass, equivalent to
+    calling olc.decode() on each tile's plus code (up to the last bit of the float results).
+    @param tiles array-like of tile addresses, or of packed tile ids; sizes may be mixed
+    @return a TileBounds tuple of float64 arrays with the same shape as tiles
+    '''
+    rows, columns, levels = return_grid_coordinate_arrays_of_tile_ids(return_tile_id_array(tiles))
+    ''' as in olc.decode, start from integer values in units of 1/PAIR_PRECISION_ degrees '''
+    place_values = ENCODING_BASE ** (PINPOINT_LEVEL - levels)
+    south = (rows * place_values - olc.LATITUDE_MAX_ * olc.PAIR_PRECISION_) / olc.PAIR_PRECISION_
+    west = (columns * place_values - olc.LONGITUDE_MAX_ * olc.PAIR_PRECISION_) / olc.PAIR_PRECISION_
+    precision = place_values / olc.PAIR_PRECISION_
+    north = np.round(south + precision, 14)
+    east = np.round(west + precision, 14)
+    south = np.round(south, 14)
+    west = np.round(west, 14)
+    latitude_center = np.minimum(south + (north - south) / 2, olc.LATITUDE_MAX_)
+    longitude_center = np.minimum(west + (east - west) / 2, olc.LONGITUDE_MAX_)
+    return TileBounds(south, west, north, east, latitude_center, longitude_center)
+
+
+def return_grid_coordinate_arrays_of_same_size_tiles(tiles, other_tiles=None):
+    '''
+    Grid coordinates of two arrays of tiles which all need to be of the same size.
+    @return (rows, columns, other_rows, other_columns, level)
+    '''
+    rows, columns, levels = return_grid_coordinate_arrays_of_tile_ids(return_tile_id_array(tiles))
+    if other_tiles is None:
+        other_rows, other_columns, other_levels = rows, columns, levels
+    else:
+        other_rows, other_columns, other_levels = return_grid_coordinate_arrays_of_tile_ids(
+            return_tile_id_array(other_tiles))
+    all_levels = np.concatenate([levels.ravel(), other_levels.ravel()])
+    if all_levels.size and (all_levels != all_levels[0]).any():
+        raise Exception("Tile sizes don't match")
+    level = int(all_levels[0]) if all_levels.size else PINPOINT_LEVEL
+    return rows, columns, other_rows, other_columns, level
+
+
+def return_tile_distance_matrices(tiles, other_tiles=None):
+    '''
+    Signed latitudinal and longitudinal tile distances from every tile in other_tiles to every
+    tile in tiles, i.e. tiles[i].getLatitudinalTileDistance(other_tiles[j], False) and
+    tiles[i].getLongitudinalTileDistance(other_tiles[j], False), including its wrapping rule.
+    @param tiles 1-dimensional array-like of tile addresses or packed tile ids, all of the same size
+    @param other_tiles another such array; if None, distances between all pairs of tiles
+    @return (latitudinal, longitudinal) int64 arrays of shape (len(tiles), len(other_tiles))
+    '''
+    rows, columns, other_rows, other_columns, level = return_grid_coordinate_arrays_of_same_size_tiles(
+        np.ravel(tiles), None if other_tiles is None else np.ravel(other_tiles))
+    latitudinal = rows[:, np.newaxis] - other_rows[np.newaxis, :]
+
+    ''' columns split into the first longitudinal character and the remaining ones; only the
+        first character wraps around, as in OpenGeoTile.getLongitudinalTileDistance() '''
+    scale = ENCODING_BASE ** (level - 1)
+    first_columns, column_remainders = np.divmod(columns, scale)
+    other_first_columns, other_column_remainders = np.divmod(other_columns, scale)
+    first_differences = first_columns[:, np.newaxis] - other_first_columns[np.newaxis, :]
+    first_differences = np.where(first_differences > LONGITUDE_FIRST_DIGIT_COUNT / 2,
+                                 first_differences - LONGITUDE_FIRST_DIGIT_COUNT, first_differences)
+    first_differences = np.where(first_differences < -LONGITUDE_FIRST_DIGIT_COUNT / 2,
+                                 first_differences + LONGITUDE_FIRST_DIGIT_COUNT, first_differences)
+    longitudinal = (first_differences * scale
+                    + column_remainders[:, np.newaxis] - other_column_remainders[np.newaxis, :])
+    return latitudinal, longitudinal
+
+
+def manhattan_tile_distances(tiles, other_tiles=None):
+    '''
+    Matrix of OpenGeoTile.getManhattanTileDistanceTo() between all tiles and other_tiles, see
+    {@link return_tile_distance_matrices}.
+    '''
+    latitudinal, longitudinal = return_tile_distance_matrices(tiles, other_tiles)
+    return np.abs(latitudinal) + np.abs(longitudinal)
+
+
+def chebyshev_tile_distances(tiles, other_tiles=None):
+    '''
+    Matrix of OpenGeoTile.getChebyshevTileDistanceTo() between all tiles and other_tiles, see
+    {@link return_tile_distance_matrices}.
+    '''
+    latitudinal, longitudinal = return_tile_distance_matrices(tiles, other_tiles)
+    return np.maximum(np.abs(latitudinal), np.abs(longitudinal))
+
+
+def tile_directions(tiles, other_tiles=None):
+    '''
+    Matrix of OpenGeoTile.getDirection() between all tiles and other_tiles, in radians, see
+    {@link return_tile_distance_matrices}.
+    '''
+    latitudinal, longitudinal = return_tile_distance_matrices(tiles, other_tiles)
+    return np.arctan2(latitudinal, longitudinal)
+
+
+def return_disk_tile_id_array(tile, distance, manhattan=False, min_distance=0):
+    '''
+    Packed tile ids of all tiles of the same size as tile within the given Chebyshev (or
+    Manhattan) tile distance, in the order of OpenGeoTile.iterateDiskAddresses(): south to north
+    and west to east, tiles beyond the poles left out, longitude wrapping at the antimeridian.
+    @param tile an OpenGeoTile, tile address or packed tile id
+    @param min_distance leave out tiles closer to tile than min_distance
+    @return a 1-dimensional int64 array
+    '''
+    if distance < 0 or min_distance < 0:
+        raise Exception("Tile distance must not be negative")
+    rows, columns, levels = return_grid_coordinate_arrays_of_tile_ids(
+        return_tile_id_array([tile.getTileAddress() if isinstance(tile, OpenGeoTile) else tile]))
+    tile_size = TILE_SIZE_BY_CODE_LENGTH[2 * int(levels[0])]
+    grid_rows, grid_columns = return_grid_dimensions(tile_size)
+
+    ''' each column once, at its smallest offset from the tile's column '''
+    row_offsets = np.arange(-distance, distance + 1, dtype=np.int64)
+    column_offsets = np.arange(-min(distance, (grid_columns - 1) // 2), min(distance, grid_columns // 2) + 1,
+                               dtype=np.int64)
+    row_offsets = row_offsets[(rows[0] + row_offsets >= 0) & (rows[0] + row_offsets < grid_rows)]
+    row_offset_grid, column_offset_grid = np.meshgrid(row_offsets, column_offsets, indexing='ij')
+    if manhattan:
+        distances = np.abs(row_offset_grid) + np.abs(column_offset_grid)
+    else:
+        distances = np.maximum(np.abs(row_offset_grid), np.abs(column_offset_grid))
+    selected = (distances >= min_distance) & (distances <= distance)
+    return return_tile_id_array_of_grid_coordinates(rows[0] + row_offset_grid[selected],
+                                                    (columns[0] + column_offset_grid[selected]) % grid_columns,
+                                                    tile_size)
+
+
+def return_ring_tile_id_array(tile, distance, manhattan=False):
+    '''
+    Packed tile ids of all tiles of the same size as tile at exactly the given tile distance, in
+    the order of OpenGeoTile.iterateRingAddresses(), see {@link return_disk_tile_id_array}.
+    '''
+    return return_disk_tile_id_array(tile, distance, manhattan, min_distance=distance)
@@ -0,0 +1,172 @@
+from OpenGeoTile import (TileSize, TILE_ID_LEVEL_MASK, TILE_SIZE_BY_CODE_LENGTH, return_tile_id_of_address,
+                         return_tile_id_prefix_shift)
+from TileArrays import (encode_tiles, return_tile_id_array, return_prefix_tile_id_array,
+                        return_address_array_of_tile_ids)
+from collections import namedtuple
+import numpy as np
+
+'''
+    Aggregation of weighted locations or tiles per tile, at all tile sizes (a tile pyramid), e.g.
+    for heatmaps of event counts.
+'''
+
+''' per tile statistics of one tile size as arrays ordered by tile id: the total weight of each
+    tile, and the smallest and biggest total weight of a non-empty tile of the pyramid's tile size
+    inside it '''
+TileStatistics = namedtuple('TileStatistics', ['tile_ids', 'sums', 'mins', 'maxs'])
+
+
+class TilePyramid():
+    '''
+    Weights added per tile of a fixed tile size, stored as compact sorted arrays of packed tile ids
+    (see OpenGeoTile.PackedTile) and total weights, plus rolled-up statistics for every bigger tile
+    size. The rolled-up levels are computed when first asked for and afterwards only updated for
+    the tiles that received new weights.
+
+    Because sorting packed tile ids sorts tiles by address, all tiles inside a bigger tile form one
+    contiguous slice of the sorted arrays, so rolling up is a single pass without any hashing.
+    '''
+    def __init__(self, tile_size=TileSize.PINPOINT):
+        '''
+        @param tile_size the size of the tiles weights are stored for; the smallest size that can
+        be queried
+        '''
+        self.tile_size = tile_size
+        self.tile_ids = np.zeros(0, dtype=np.int64)
+        self.weights = np.zeros(0, dtype=np.float64)
+        ''' {TileSize: TileStatistics} of the rolled-up sizes computed so far, and per size the ids
+            of the tiles that have received weights since '''
+        self.statistics_by_tile_size = {}
+        self.changed_tile_ids_by_tile_size = {}
+
+    def getTileSize(self):
+        return self.tile_size
+
+    def getTotalWeight(self):
+        return float(self.weights.sum())
+
+    def addLatLongs(self, lats, longs, weights=None):
+        '''
+        Add weighted locations.
+        @param lats array-like of latitudes
+        @param longs array-like of longitudes, same shape as lats
+        @param weights array-like of weights, same shape as lats; 1 for each location if None
+        '''
+        self.addTileIds(encode_tiles(lats, longs, self.tile_size, return_tile_ids=True), weights)
+
+    def addTiles(self, tiles, weights=None):
+        '''
+        Add weighted tiles of this pyramid's tile size or smaller.
+        @param tiles array-like of tile addresses or packed tile ids
+        @param weights array-like of weights, same shape as tiles; 1 for each tile if None
+        @throws Exception if a tile is bigger than this pyramid's tile size
+        '''
+        self.addTileIds(return_tile_id_array(tiles), weights)
+
+    def addTileIds(self, tile_ids, weights=None):
+        ''' {@link #addTiles} for an int64 array of packed tile ids '''
+        tile_ids = np.asarray(tile_ids, dtype=np.int64).ravel()
+        if weights is None:
+            weights = np.ones(tile_ids.shape, dtype=np.float64)
+        else:
+            weights = np.asarray(weights, dtype=np.float64).ravel()
+            if weights.shape != tile_ids.shape:
+                raise Exception("Tiles and weights must have the same shape")
+        levels = tile_ids & TILE_ID_LEVEL_MASK
+        if (levels > TileSize.PINPOINT.getCodeLength() // 2).any():
+            raise Exception("Invalid tile id")
+        if (levels < self.tile_size.getCodeLength() // 2).any():
+            raise Exception("Tiles must not be bigger than the tile size of this pyramid")
+        if len(tile_ids) == 0:
+            return
+
+        batch_tile_ids, inverse = np.unique(return_prefix_tile_id_array(tile_ids, self.tile_size),
+                                            return_inverse=True)
+        batch_weights = np.bincount(inverse.ravel(), weights=weights, minlength=len(batch_tile_ids))
+
+        ''' merge into the sorted arrays: add to existing tiles, insert the others '''
+        positions = np.searchsorted(self.tile_ids, batch_tile_ids)
+        existing = positions < len(self.tile_ids)
+        existing[existing] = self.tile_ids[positions[existing]] == batch_tile_ids[existing]
+        np.add.at(self.weights, positions[existing], batch_weights[existing])
+        self.tile_ids = np.insert(self.tile_ids, positions[~existing], batch_tile_ids[~existing])
+        self.weights = np.insert(self.weights, positions[~existing], batch_weights[~existing])
+
+        for tile_size in self.statistics_by_tile_size:
+            self.changed_tile_ids_by_tile_size[tile_size].append(
+                np.unique(return_prefix_tile_id_array(batch_tile_ids, tile_size)))
+
+    def returnRolledUpStatistics(self, tile_ids, tile_size):
+        '''
+        Statistics of the given tiles of tile_size, computed from all weights inside them.
+        @param tile_ids sorted unique packed ids of non-empty tiles of tile_size
+        '''
+        if len(tile_ids) == 0:
+            return TileStatistics(tile_ids, *(np.zeros(0, dtype=np.float64) for i in range(3)))
+        ''' the first id of each tile is its own id, the first id after it is that of the next
+            tile of the same size, which may not exist as a tile but sorts correctly '''
+        prefix_shift = return_tile_id_prefix_shift(tile_size.getCodeLength())
+        starts = np.searchsorted(self.tile_ids, tile_ids)
+        ends = np.searchsorted(self.tile_ids, tile_ids + (1 << prefix_shift))
+        lengths = ends - starts
+        ''' all slices concatenated, to reduce them in one go '''
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        positions = np.arange(lengths.sum()) - np.repeat(offsets - starts, lengths)
+        slice_weights = self.weights[positions]
+        return TileStatistics(tile_ids,
+                              np.add.reduceat(slice_weights, offsets),
+                              np.minimum.reduceat(slice_weights, offsets),
+                              np.maximum.reduceat(slice_weights, offsets))
+
+    def returnStatistics(self, tile_size=None):
+        '''
+        Per tile statistics of all non-empty tiles of tile_size.
+        @param tile_size this pyramid's tile size or bigger; this pyramid's tile size if None
+        @return a TileStatistics tuple of arrays ordered by tile id (and so by address); for the
+        pyramid's own tile size, sums, mins and maxs are the same
+        '''
+        if tile_size is None or tile_size == self.tile_size:
+            weights = self.weights.copy()
+            return TileStatistics(self.tile_ids.copy(), weights, weights, weights)
+        if tile_size.getCodeLength() > self.tile_size.getCodeLength():
+            raise Exception("Tile size must not be smaller than the tile size of this pyramid")
+
+        if tile_size not in self.statistics_by_tile_size:
+            tile_ids = np.unique(return_prefix_tile_id_array(self.tile_ids, tile_size))
+            self.statistics_by_tile_size[tile_size] = self.returnRolledUpStatistics(tile_ids, tile_size)
+            self.changed_tile_ids_by_tile_size[tile_size] = []
+        elif self.changed_tile_ids_by_tile_size[tile_size]:
+            ''' recompute only the changed tiles and merge them into the known ones '''
+            changed_tile_ids = np.unique(np.concatenate(self.changed_tile_ids_by_tile_size[tile_size]))
+            self.changed_tile_ids_by_tile_size[tile_size] = []
+            changed = self.returnRolledUpStatistics(changed_tile_ids, tile_size)
+            statistics = self.statistics_by_tile_size[tile_size]
+            positions = np.searchsorted(statistics.tile_ids, changed_tile_ids)
+            existing = positions < len(statistics.tile_ids)
+            existing[existing] = statistics.tile_ids[positions[existing]] == changed_tile_ids[existing]
+            merged = []
+            for values, changed_values in zip(statistics, changed):
+                values = values.copy()
+                values[positions[existing]] = changed_values[existing]
+                merged.append(np.insert(values, positions[~existing], changed_values[~existing]))
+            self.statistics_by_tile_size[tile_size] = TileStatistics(*merged)
+        return self.statistics_by_tile_size[tile_size]
+
+    def returnAddressStatistics(self, tile_size=None):
+        ''' {@link #returnStatistics}, with tile addresses instead of packed tile ids '''
+        tile_size = tile_size or self.tile_size
+        statistics = self.returnStatistics(tile_size)
+        return statistics._replace(tile_ids=return_address_array_of_tile_ids(statistics.tile_ids, tile_size))
+
+    def getWeightOfTileAddress(self, tile_address):
+        '''
+        Total weight inside a tile of this pyramid's tile size or bigger, without rolling up a
+        whole level.
+        '''
+        tile_size = TILE_SIZE_BY_CODE_LENGTH[len(tile_address)]
+        if tile_size.getCodeLength() > self.tile_size.getCodeLength():
+            raise Exception("Tile size must not be smaller than the tile size of this pyramid")
+        tile_id = return_tile_id_of_address(tile_address)
+        prefix_shift = return_tile_id_prefix_shift(len(tile_address))
+        start, end = np.searchsorted(self.tile_ids, [tile_id, tile_id + (1 << prefix_shift)])
+        return float(self.weights[start:end].sum())
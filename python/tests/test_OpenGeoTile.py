@@ -1,5 +1,8 @@
-from OpenGeoTile import OpenGeoTile, TileSize
+from OpenGeoTile import OpenGeoTile, TileSize, CODE_ALPHABET
 from openlocationcode import openlocationcode as olc
+import OpenGeoTile as ogt
+import itertools
+import pytest
 
 '''
     by scoofy on 09.08.21
@@ -150,6 +153,23 @@ def test_getNeighbors_isNeighbor():
 
 #isSameTile -> test_constructionsSameBlock
 
+def test_equality_and_hash():
+    peuget_sound_from_code = OpenGeoTile('84VV0000+')
+    peuget_sound_from_address = OpenGeoTile('84VV')
+    peuget_sound_from_lat_long = OpenGeoTile(lat=47.625, long=-122.325, tile_size=TileSize.REGION)
+    assert peuget_sound_from_code == peuget_sound_from_address == peuget_sound_from_lat_long
+    assert len({peuget_sound_from_code, peuget_sound_from_address, peuget_sound_from_lat_long}) == 1
+    assert peuget_sound_from_code != OpenGeoTile('84VVJM00+')
+    assert peuget_sound_from_code != OpenGeoTile('84')
+    assert peuget_sound_from_code != '84VV'
+
+    seattle = OpenGeoTile('84VVJM00+')
+    neighbors_of_neighbors = set()
+    for neighbor in seattle.getNeighbors():
+        neighbors_of_neighbors |= neighbor.getNeighbors()
+    assert len(neighbors_of_neighbors) == 5 * 5
+
+
 def test_contains():
     peuget_sound = OpenGeoTile('84VV0000+')
     seattle = OpenGeoTile('84VVJM00+')
@@ -276,3 +296,93 @@ def test_returnSetOfBorderSubtiles():
 
 
 
+def test_iterateSubtiles():
+    seattle = OpenGeoTile('84VVJM00+')
+    assert seattle.getSubtileCount(TileSize.DISTRICT) == 1
+    assert seattle.getSubtileCount(TileSize.NEIGHBORHOOD) == 20 * 20
+    assert seattle.getSubtileCount() == 20 * 20 * 20 * 20
+    assert OpenGeoTile('84').getSubtileCount() == 400 ** 4
+
+    subtile_addresses = list(seattle.iterateSubtileAddresses())
+    assert len(subtile_addresses) == seattle.getSubtileCount()
+    assert subtile_addresses == sorted(subtile_addresses, key=lambda address: [CODE_ALPHABET.index(c) for c in address])
+    assert set(subtile_addresses) == {tile.getTileAddress() for tile in seattle.returnSetOfSubtiles()}
+    assert subtile_addresses[0] == '84VVJM2222'
+    assert subtile_addresses[-1] == '84VVJMXXXX'
+    for n in [0, 1, 19, 20, 399, 400, 12345, len(subtile_addresses) - 1]:
+        assert seattle.getNthSubtileAddress(n) == subtile_addresses[n]
+
+    subtile_ids = list(seattle.iterateSubtileIds())
+    assert subtile_ids == [ogt.return_tile_id_of_address(address) for address in subtile_addresses]
+    assert list(seattle.iterateSubtileAddresses(TileSize.DISTRICT)) == ['84VVJM']
+
+    ''' lazy: taking the first subtiles of a GLOBAL tile does not enumerate all of them '''
+    first_subtiles = list(itertools.islice(OpenGeoTile('84').iterateSubtileAddresses(), 3))
+    assert first_subtiles == ['8422222222', '8422222223', '8422222224']
+
+    with pytest.raises(Exception):
+        seattle.getNthSubtileAddress(seattle.getSubtileCount())
+    with pytest.raises(Exception):
+        seattle.iterateSubtileAddresses(TileSize.REGION)
+
+def test_iterateBorderSubtileAddresses():
+    seattle = OpenGeoTile('84VVJM00+')
+    subtile_grid = {}
+    for address in seattle.iterateSubtileAddresses():
+        subtile_grid[OpenGeoTile(address).getGridCoordinates()] = address
+    min_row = min(row for row, column in subtile_grid)
+    max_row = max(row for row, column in subtile_grid)
+    min_column = min(column for row, column in subtile_grid)
+    max_column = max(column for row, column in subtile_grid)
+
+    expected_borders = {
+        'N': {address for (row, column), address in subtile_grid.items() if row == max_row},
+        'S': {address for (row, column), address in subtile_grid.items() if row == min_row},
+        'E': {address for (row, column), address in subtile_grid.items() if column == max_column},
+        'W': {address for (row, column), address in subtile_grid.items() if column == min_column},
+        'NE': {subtile_grid[(max_row, max_column)]},
+        'SW': {subtile_grid[(min_row, min_column)]},
+    }
+    for direction, expected_addresses in expected_borders.items():
+        border_addresses = list(seattle.iterateBorderSubtileAddresses(eight_point_direction=direction))
+        assert len(border_addresses) == len(expected_addresses)
+        assert set(border_addresses) == expected_addresses
+
+    all_border_addresses = list(seattle.iterateBorderSubtileAddresses())
+    assert len(all_border_addresses) == 4 * 400 - 4
+    assert set(all_border_addresses) == set().union(*expected_borders.values())
+    assert all_border_addresses == list(seattle.iterateBorderSubtileAddresses())
+
+    ''' at the tile's own size, the tile is its only border subtile '''
+    assert list(seattle.iterateBorderSubtileAddresses(TileSize.DISTRICT)) == ['84VVJM']
+    assert list(seattle.iterateBorderSubtileAddresses(TileSize.DISTRICT, 'NE')) == ['84VVJM']
+
+    with pytest.raises(Exception):
+        list(seattle.iterateBorderSubtileAddresses(eight_point_direction='Q'))
+    with pytest.raises(Exception):
+        seattle.returnSetOfBorderSubtiles(desired_tile_size=TileSize.REGION)
+
+def test_iterateBorderSubtileAddresses_is_lazy():
+    global_tile = OpenGeoTile('84')
+    first_border_addresses = list(itertools.islice(global_tile.iterateBorderSubtileAddresses(), 2))
+    assert first_border_addresses == ['84X2X2X2X2', '84X2X2X2X3']
+
+def test_pickled_tiles_hash_consistently_in_other_processes():
+    import os, pickle, subprocess, sys
+    from TileArea import TileArea
+    tile = OpenGeoTile('849VQHC2+X2')
+    area = TileArea([OpenGeoTile('849VQH00+'), tile])
+    check = (
+        "import pickle, sys\n"
+        "from OpenGeoTile import OpenGeoTile\n"
+        "tile, area = pickle.loads(sys.stdin.buffer.read())\n"
+        "assert tile == OpenGeoTile('849VQHC2+X2')\n"
+        "assert tile in {OpenGeoTile('849VQHC2+X2')}\n"
+        "assert OpenGeoTile('849VQH00+') in area.tile_set\n"
+        "assert area.contains(OpenGeoTile('849VQHC2+X2'))\n"
+    )
+    module_directory = os.path.dirname(os.path.abspath(ogt.__file__))
+    environment = dict(os.environ, PYTHONPATH=module_directory, PYTHONHASHSEED='random')
+    result = subprocess.run([sys.executable, '-c', check], input=pickle.dumps((tile, area)),
+                            env=environment, capture_output=True)
+    assert result.returncode == 0, result.stderr.decode()
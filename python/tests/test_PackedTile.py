@@ -0,0 +1,75 @@
+from OpenGeoTile import OpenGeoTile, PackedTile, TileSize
+import OpenGeoTile as ogt
+import pytest
+
+gum_wall = '84VVJM558V'
+pikes_place = '84VVJM55'
+seattle = '84VVJM'
+peuget_sound = '84VV'
+us_west_coast = '84'
+
+address_list = [gum_wall, pikes_place, seattle, peuget_sound, us_west_coast]
+
+def test_address_round_trip():
+    for address in address_list + ['22', 'CV', 'C2XXXXXXXX', '2222222222']:
+        tile = PackedTile.fromTileAddress(address)
+        assert tile.getTileAddress() == address
+        assert tile.getTileSize() == OpenGeoTile(address).getTileSize()
+        assert tile.toOpenGeoTile().isSameTile(OpenGeoTile(address))
+
+def test_code_round_trip():
+    for address in address_list:
+        tile = OpenGeoTile(address)
+        packed_tile = PackedTile.fromOpenGeoTile(tile)
+        assert packed_tile.getTileOpenLocationCode() == tile.getTileOpenLocationCode()
+        assert PackedTile.fromCode(tile.getTileOpenLocationCode()) == packed_tile
+    assert PackedTile.fromCode('84VVJM00+', TileSize.REGION).getTileAddress() == peuget_sound
+
+def test_tile_id_fits_in_64_bits():
+    assert PackedTile.fromTileAddress('CVXXXXXXXX').getTileId() < 2 ** 63
+
+def test_lowercase_address():
+    assert PackedTile.fromTileAddress('84vvjm') == PackedTile.fromTileAddress(seattle)
+
+def test_invalid_tile_address():
+    for invalid_address in ['', '8', '84V', '84VVJM558V22', '84AA']:
+        with pytest.raises(Exception):
+            PackedTile.fromTileAddress(invalid_address)
+    with pytest.raises(Exception):
+        PackedTile(0)
+
+def test_parent():
+    for index, address in enumerate(address_list):
+        tile = PackedTile.fromTileAddress(address)
+        parent_address = address_list[index + 1] if index + 1 < len(address_list) else ""
+        assert tile.getParentTileAddress() == OpenGeoTile(address).getParentTileAddress()
+        assert tile.getParentTileAddress() == parent_address
+        if parent_address:
+            assert tile.getParentTile().getTileAddress() == parent_address
+        else:
+            assert tile.getParentTile() is None
+
+def test_contains():
+    for bigger_index, bigger_address in enumerate(address_list):
+        bigger_tile = PackedTile.fromTileAddress(bigger_address)
+        for smaller_index, smaller_address in enumerate(address_list):
+            smaller_tile = PackedTile.fromTileAddress(smaller_address)
+            assert bigger_tile.contains(smaller_tile) == (smaller_index <= bigger_index)
+    assert not PackedTile.fromTileAddress('849V').contains(PackedTile.fromTileAddress(seattle))
+    # '2' is the zero digit; a longer address of 2s is still only contained, never containing
+    assert not PackedTile.fromTileAddress('8422').contains(PackedTile.fromTileAddress('84'))
+    assert PackedTile.fromTileAddress('84').contains(OpenGeoTile('8422'))
+
+def test_sorting_by_id_sorts_by_address():
+    addresses = ['84', '8422', '842222', '8423', '84VV', '85', 'C2']
+    assert sorted(addresses, key=ogt.return_tile_id_of_address) == addresses
+
+def test_equality_and_hash():
+    assert PackedTile.fromTileAddress(seattle) == PackedTile.fromTileAddress(seattle)
+    assert PackedTile.fromTileAddress('84') != PackedTile.fromTileAddress('8422')
+    assert len({PackedTile.fromTileAddress(seattle), PackedTile.fromTileAddress(seattle)}) == 1
+    assert PackedTile.fromTileAddress(seattle).isSameTile(OpenGeoTile(seattle))
+
+def test_slots():
+    with pytest.raises(AttributeError):
+        PackedTile.fromTileAddress(seattle).address = seattle
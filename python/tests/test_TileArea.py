@@ -1,5 +1,5 @@
 from openlocationcode import openlocationcode as olc
-from TileArea import TileArea
+from TileArea import TileArea, SimpleTileArea, MergingTileArea, RowIntervalTileArea
 from OpenGeoTile import OpenGeoTile, TileSize
 import pytest
 
@@ -56,6 +56,12 @@ def test_getShortestCoveringTileList():
     assert len(de_Young_TileArea.tile_set) == 1
     assert '84' in {t.getTileAddress() for t in de_Young_TileArea.tile_set}
 
+def test_tile_set_deduplicates():
+    duplicated_tile_list = san_francisco_tile_list + [OpenGeoTile(code) for code in san_francisco_codes]
+    san_francisco_TileArea = TileArea(duplicated_tile_list)
+    assert len(san_francisco_TileArea.tile_set) == len(san_francisco_codes)
+    assert OpenGeoTile('849VQH') in san_francisco_TileArea.tile_set
+
 def test_TileArea_contains():
     san_francisco_TileArea = TileArea(san_francisco_tile_list)
 
@@ -68,6 +74,115 @@ def test_TileArea_contains():
     assert not san_francisco_TileArea.contains(uc_berkeley_statium)
     assert not san_francisco_TileArea.contains(western_coast_usa)
 
+def test_contains_index_follows_tile_set():
+    san_francisco_TileArea = TileArea(san_francisco_tile_list)
+    assert san_francisco_TileArea.address_set == {t.getTileAddress() for t in san_francisco_tile_list}
+    assert san_francisco_TileArea.contains(OpenGeoTile('849VQHXX+XX'))
+
+    san_francisco_TileArea.tile_set = {OpenGeoTile('849VRG00+')}
+    assert san_francisco_TileArea.contains(OpenGeoTile('849VRGC2+'))
+    assert not san_francisco_TileArea.contains(OpenGeoTile('849VQHXX+XX'))
+
+    simple_TileArea = SimpleTileArea({OpenGeoTile('849VQH00+')})
+    assert not simple_TileArea.contains(OpenGeoTile('849VVPCX+'))
+    simple_TileArea.addTile(OpenGeoTile('849VVPCX+'))
+    assert simple_TileArea.contains(OpenGeoTile('849VVPCX+2X'))
+    assert simple_TileArea.contains(OpenGeoTile('849VQH22+'))
+    assert not simple_TileArea.contains(OpenGeoTile('849V0000+'))
+
+def test_incremental_merging():
+    district_address = '849VQH'
+    neighborhood_addresses = [district_address + x + y for x in CODE_ALPHABET for y in CODE_ALPHABET]
+    merging_TileArea = TileArea([OpenGeoTile(address) for address in neighborhood_addresses[:-1]])
+    assert len(merging_TileArea.tile_set) == 399
+
+    ''' completing the last neighborhood completes the district as well '''
+    last_neighborhood = OpenGeoTile(neighborhood_addresses[-1])
+    for pinpoint in last_neighborhood.returnSetOfSubtiles(TileSize.PINPOINT):
+        merging_TileArea.addTile(pinpoint)
+    assert {t.getTileAddress() for t in merging_TileArea.tile_set} == {district_address}
+    assert merging_TileArea.address_set == {district_address}
+    assert merging_TileArea.child_pairs_by_prefix == {'': {'84'}, '84': {'9V'}, '849V': {'QH'}}
+
+    ''' adding a bigger tile replaces the smaller ones inside it '''
+    merging_TileArea.addTile(OpenGeoTile('849VRG00+'))
+    merging_TileArea.addTile(OpenGeoTile('849V0000+'))
+    assert {t.getTileAddress() for t in merging_TileArea.tile_set} == {'849V'}
+    assert merging_TileArea.member_child_counts == {'84': 1}
+
+def test_MergingTileArea():
+    district_tile = OpenGeoTile('849VQH00+')
+    neighborhood_tiles = sorted(district_tile.returnSetOfSubtiles(TileSize.NEIGHBORHOOD), key=lambda t: t.getTileAddress())
+    merging_TileArea = MergingTileArea(neighborhood_tiles[:2], subtiles_per_tile=3)
+    assert len(merging_TileArea.tile_set) == 2
+    merging_TileArea.addTile(neighborhood_tiles[-1])
+    assert merging_TileArea.tile_set == {district_tile}
+
+    assert MergingTileArea(neighborhood_tiles[:2], subtiles_per_tile=1).tile_set == {district_tile}
+    assert len(MergingTileArea(neighborhood_tiles, max_allowed_tile_size=TileSize.NEIGHBORHOOD).tile_set) == 400
+    assert MergingTileArea(neighborhood_tiles, max_allowed_tile_size=TileSize.DISTRICT).tile_set == {district_tile}
+
+def test_set_algebra():
+    def neighborhood_addresses(tile_area):
+        return {subtile.getTileAddress() for tile in tile_area.tile_set
+                for subtile in ([tile] if tile.getTileSize() == TileSize.NEIGHBORHOOD
+                                else tile.returnSetOfSubtiles(TileSize.NEIGHBORHOOD))}
+
+    first_TileArea = TileArea([OpenGeoTile(code) for code in
+                               ["849VQH00+", "849VQJ00+", "849VRG00+", "849VRHC2+", "849VPF22+", "849VPF23+"]])
+    second_TileArea = TileArea([OpenGeoTile(code) for code in
+                                ["849VQHC2+", "849VQHC3+", "849VQJ00+", "849VRH00+", "849VPF23+", "849VVP22+"]])
+    first_addresses = neighborhood_addresses(first_TileArea)
+    second_addresses = neighborhood_addresses(second_TileArea)
+
+    union_TileArea = first_TileArea.union(second_TileArea)
+    assert neighborhood_addresses(union_TileArea) == first_addresses | second_addresses
+    assert {"849VQH", "849VQJ", "849VRG", "849VRH"} <= {t.getTileAddress() for t in union_TileArea.tile_set}
+    intersection_TileArea = first_TileArea.intersection(second_TileArea)
+    assert neighborhood_addresses(intersection_TileArea) == first_addresses & second_addresses
+    assert {t.getTileAddress() for t in intersection_TileArea.tile_set} == \
+        {"849VQHC2", "849VQHC3", "849VQJ", "849VRHC2", "849VPF23"}
+    difference_TileArea = first_TileArea.difference(second_TileArea)
+    assert neighborhood_addresses(difference_TileArea) == first_addresses - second_addresses
+    assert len(difference_TileArea.tile_set) == 398 + 1 + 1
+    assert neighborhood_addresses(first_TileArea.symmetricDifference(second_TileArea)) == \
+        first_addresses ^ second_addresses
+
+    assert first_TileArea.difference(first_TileArea).tile_set == set()
+    assert first_TileArea.intersection(TileArea(OpenGeoTile("84000000+"))).tile_set == first_TileArea.tile_set
+    assert TileArea(OpenGeoTile("84000000+")).difference(first_TileArea).contains(OpenGeoTile("849VQG00+"))
+
+def test_removeTile():
+    district_tile = OpenGeoTile('849VQH00+')
+    pinpoint_tile = OpenGeoTile('849VQHC2+X2')
+    district_TileArea = TileArea(district_tile)
+    district_TileArea.removeTile(pinpoint_tile)
+    assert len(district_TileArea.tile_set) == 399 + 399
+    assert not district_TileArea.contains(pinpoint_tile)
+    assert not district_TileArea.contains(district_tile)
+    assert district_TileArea.contains(OpenGeoTile('849VQHC2+X3'))
+    assert district_TileArea.contains(OpenGeoTile('849VQHC3+'))
+    assert district_TileArea.member_child_counts == {'849VQH': 399, '849VQHC2': 399}
+
+    ''' adding the tile again restores the district '''
+    district_TileArea.addTile(pinpoint_tile)
+    assert district_TileArea.tile_set == {district_tile}
+
+    ''' removing a bigger tile removes all tiles inside it '''
+    district_TileArea.removeTile(pinpoint_tile)
+    district_TileArea.removeTile(OpenGeoTile('849VQHC2+'))
+    assert len(district_TileArea.tile_set) == 399
+    district_TileArea.removeTileArea(TileArea(district_tile))
+    assert district_TileArea.tile_set == set()
+    assert district_TileArea.child_pairs_by_prefix == {}
+
+    simple_TileArea = SimpleTileArea({OpenGeoTile('849VQH00+')})
+    simple_TileArea.addNonContainedTile(OpenGeoTile('849VQHC2+'))
+    simple_TileArea.removeTile(pinpoint_tile)
+    assert not simple_TileArea.contains(pinpoint_tile)
+    assert simple_TileArea.contains(OpenGeoTile('849VQHC2+X3'))
+    assert simple_TileArea.getSmallestTileSize() == TileSize.PINPOINT
+
 def test_getSmallestTileSize():
     san_francisco_TileArea = TileArea(san_francisco_tile_list)
 
@@ -123,6 +238,48 @@ def test_containsLatLong():
     assert not san_francisco_TileArea.containsLatLong(eiffel_tower_lat, eiffel_tower_long)
 
 
+def test_containsLatLongs():
+    import numpy as np
+    area = MergingTileArea(san_francisco_tile_list)
+    area.addTile(OpenGeoTile("849VMGX2+"))
+    area.addTile(OpenGeoTile("849VMGW2+X7"))
+    area.removeTile(OpenGeoTile("849VQHC2+X2"))
+    rng = np.random.default_rng(7)
+    lats = rng.uniform(37.55, 37.85, 2000)
+    longs = rng.uniform(-122.65, -122.25, 2000)
+    mask = area.containsLatLongs(lats, longs)
+    assert mask.shape == (2000,)
+    assert mask.any() and not mask.all()
+    assert mask.tolist() == [area.containsLatLong(lat, long) for lat, long in zip(lats, longs)]
+    assert area.containsLatLongs([37.795, 37.7], [-122.4375, -122.4]).tolist() == \
+           [area.containsLatLong(37.795, -122.4375), area.containsLatLong(37.7, -122.4)]
+    ''' changes to the area are picked up '''
+    area.removeTile(OpenGeoTile("849VQH00+"))
+    assert area.containsLatLongs(lats, longs).tolist() == \
+           [area.containsLatLong(lat, long) for lat, long in zip(lats, longs)]
+    assert not TileArea(set()).containsLatLongs(lats, longs).any()
+
+def test_getCoveringTileSet():
+    area = MergingTileArea(OpenGeoTile("849VQH00+"))
+    area.removeTile(OpenGeoTile("849VQHC2+X2"))
+    lone_tile = OpenGeoTile("849VQJJ2+X7")
+    area.addTile(lone_tile)
+    assert len(area.tile_set) == 399 + 399 + 1
+    assert area.getCoveringTileSet(1000) == area.tile_set
+    covering = area.getCoveringTileSet(500)
+    assert len(covering) <= 500
+    assert TileArea(covering).contains(OpenGeoTile("849VQHC2+X2"))
+    assert all(TileArea(covering).contains(tile) for tile in area.tile_set)
+    ''' the tile with the hole is filled rather than the lone tile's neighborhood '''
+    assert area.getCoveringTileSet(2) == {OpenGeoTile("849VQH00+"), lone_tile}
+    assert area.getCoveringTileSet(1) == {OpenGeoTile("849V0000+")}
+    assert SimpleTileArea({OpenGeoTile("849V0000+"), OpenGeoTile("849VQH00+")}).getCoveringTileSet(1) == \
+           {OpenGeoTile("849V0000+")}
+    with pytest.raises(Exception):
+        TileArea([OpenGeoTile("84000000+"), OpenGeoTile("9C000000+")]).getCoveringTileSet(1)
+    with pytest.raises(Exception):
+        area.getCoveringTileSet(0)
+
 def test_getEdgeTileSet():
     missing_digits = ['8','9','C','F','G','H','J','M','P','Q','R','V']
     gw_high_school_sf_border_addresses = [
@@ -141,6 +298,27 @@ def test_getEdgeTileSet():
     gw_edge_tiles = gw_high.getEdgeTileSet()
     assert {tile.getTileAddress() for tile in gw_edge_tiles} == set(gw_high_school_sf_border_addresses)
 
+def test_getEdgeTileSet_at_tile_size():
+    gw_high = TileArea([OpenGeoTile(address) for address in
+                        ['849VQGH5', '849VQGG5X7', '849VQGG5XW', '849VQGG5W7', '849VQGG5WW', '849VQGG5X8', '849VQGG5W8']])
+    pinpoint_addresses = {subtile.getTileAddress() for tile in gw_high.tile_set
+                          for subtile in ([tile] if tile.getTileSize() == TileSize.PINPOINT
+                                          else tile.returnSetOfSubtiles(TileSize.PINPOINT))}
+    expected_edge_addresses = {address for address in pinpoint_addresses
+                               if not OpenGeoTile(address).getNeighborAddresses() <= pinpoint_addresses}
+    assert {t.getTileAddress() for t in gw_high.getEdgeTileSet(TileSize.PINPOINT)} == expected_edge_addresses
+    assert {t.getTileAddress() for t in gw_high.getEdgeTileSet(TileSize.NEIGHBORHOOD)} == \
+        {address[:8] for address in expected_edge_addresses}
+
+    ''' only the pinpoints around a hole in a district are part of its boundary, besides its border '''
+    district_TileArea = TileArea(OpenGeoTile('849VQH00+'))
+    assert district_TileArea.getEdgeTileSet() == {OpenGeoTile('849VQH00+')}
+    district_TileArea.removeTile(OpenGeoTile('849VQHCC+X2'))
+    assert len(district_TileArea.getEdgeTileSet(TileSize.PINPOINT)) == 4 * 400 - 4 + 8
+    assert OpenGeoTile('849VQHCG+') not in district_TileArea.getEdgeTileSet()
+    assert OpenGeoTile('849VQHFC+') in district_TileArea.getEdgeTileSet()
+    assert OpenGeoTile('849VQHC9+') in district_TileArea.getEdgeTileSet()
+
 def test_expandTileArea():
     'test expand by one same sized unit'
     berkeley_codes = [
@@ -229,5 +407,65 @@ def test_expandTileArea():
     assert  {t.getTileAddress() for t in berkeley_TileArea.tile_set} == {
              t.getTileAddress() for t in border_TileArea.tile_set  }
 
-
-
+def test_dilation_and_erosion():
+    neighborhood_tile = OpenGeoTile('849VQHCC+')
+    dilated_TileArea = TileArea(neighborhood_tile).getDilatedTileArea(2, TileSize.NEIGHBORHOOD)
+    expected_addresses = set(neighborhood_tile.iterateDiskAddresses(2))
+    assert {t.getTileAddress() for t in dilated_TileArea.tile_set} == expected_addresses
+    assert {t.getTileAddress() for t in dilated_TileArea.getErodedTileArea(2, TileSize.NEIGHBORHOOD).tile_set} == \
+        {'849VQHCC'}
+    assert dilated_TileArea.getErodedTileArea(3, TileSize.NEIGHBORHOOD).tile_set == set()
+
+    district_TileArea = TileArea(OpenGeoTile('849VQH00+'))
+    eroded_TileArea = district_TileArea.getErodedTileArea(1, TileSize.NEIGHBORHOOD)
+    assert len(eroded_TileArea.tile_set) == 18 * 18
+    assert not eroded_TileArea.contains(OpenGeoTile('849VQH2C+'))
+    assert eroded_TileArea.contains(OpenGeoTile('849VQH3C+'))
+    assert district_TileArea.getDilatedTileArea(0, TileSize.NEIGHBORHOOD).tile_set == district_TileArea.tile_set
+
+    ''' smaller tiles only count for tiles of tile_size they cover completely '''
+    mixed_TileArea = TileArea([OpenGeoTile('849VQHCC+'), OpenGeoTile('849VQHCF+22')])
+    assert mixed_TileArea.getErodedTileArea(0, TileSize.NEIGHBORHOOD).tile_set == {neighborhood_tile}
+    assert mixed_TileArea.getDilatedTileArea(0, TileSize.NEIGHBORHOOD).tile_set == \
+        {neighborhood_tile, OpenGeoTile('849VQHCF+')}
+
+    ''' dilation wraps around the antimeridian and stops at the poles '''
+    pacific_TileArea = TileArea(OpenGeoTile('CV000000+')).getDilatedTileArea(1, TileSize.GLOBAL)
+    assert {t.getTileAddress() for t in pacific_TileArea.tile_set} == {'CV', 'C2', 'CR', '9V', '92', '9R'}
+
+def test_RowIntervalTileArea():
+    san_francisco_TileArea = TileArea(san_francisco_tile_list + [OpenGeoTile('849VRM22+X2')])
+    row_interval_TileArea = RowIntervalTileArea.fromTileArea(san_francisco_TileArea, TileSize.NEIGHBORHOOD)
+    assert row_interval_TileArea.getTileCount() == 11 * 400 + 1
+    ''' the added neighborhood continues a row of neighborhoods of 849VRJ '''
+    assert row_interval_TileArea.getRunCount() == 3 * 20
+    assert row_interval_TileArea.toTileArea().tile_set == \
+        set(san_francisco_tile_list) | {OpenGeoTile('849VRM22+')}
+    assert len(set(row_interval_TileArea.iterateTileAddresses())) == 11 * 400 + 1
+
+    assert row_interval_TileArea.contains(OpenGeoTile('849VQH00+'))
+    assert row_interval_TileArea.contains(OpenGeoTile('849VRH32+22'))
+    assert row_interval_TileArea.contains(OpenGeoTile('849VRM22+'))
+    assert not row_interval_TileArea.contains(OpenGeoTile('849VRM00+'))
+    assert not row_interval_TileArea.contains(OpenGeoTile('849VVPCX+'))
+    assert not row_interval_TileArea.contains(OpenGeoTile('84000000+'))
+    assert row_interval_TileArea.containsLatLong(37.767761, -122.441560)
+    assert not row_interval_TileArea.containsLatLong(37.8719, -122.2585)
+
+    ''' tiles at the start of a merged run '''
+    merged_run_TileArea = RowIntervalTileArea.fromTileArea(
+        TileArea([OpenGeoTile('849VQH00+'), OpenGeoTile('849VQJ00+')]), TileSize.NEIGHBORHOOD)
+    assert merged_run_TileArea.getRunCount() == 20
+    assert merged_run_TileArea.contains(OpenGeoTile('849VQH00+'))
+    assert merged_run_TileArea.contains(OpenGeoTile('849VQH22+'))
+    assert merged_run_TileArea.containsTileAddress('849VQH2222')
+    assert merged_run_TileArea.containsLatLong(37.77875, -122.42125)
+    assert not merged_run_TileArea.contains(OpenGeoTile('849VQG00+'))
+
+    other_TileArea = TileArea([OpenGeoTile(code) for code in ["849VQHC2+", "849VRJ00+", "849VVP00+"]])
+    union_TileArea = row_interval_TileArea.union(other_TileArea)
+    assert union_TileArea.toTileArea().tile_set == row_interval_TileArea.toTileArea().union(other_TileArea).tile_set
+    intersection_TileArea = row_interval_TileArea.intersection(RowIntervalTileArea.fromTileArea(other_TileArea, TileSize.NEIGHBORHOOD))
+    assert intersection_TileArea.toTileArea().tile_set == {OpenGeoTile('849VQHC2+'), OpenGeoTile('849VRJ00+')}
+    with pytest.raises(Exception):
+        row_interval_TileArea.union(RowIntervalTileArea.fromTileArea(other_TileArea, TileSize.PINPOINT))
@@ -0,0 +1,122 @@
+from TileAreaCatalog import TileAreaCatalog, join_point_file, iterate_point_chunks
+from TileArea import TileArea, SimpleTileArea, MergingTileArea
+from OpenGeoTile import OpenGeoTile, TileSize
+from openlocationcode import openlocationcode as olc
+import numpy as np
+import pytest
+import csv
+
+san_francisco_codes = [
+                 "849VRG00+", "849VRH00+", "849VRJ00+",
+    "849VQF00+", "849VQG00+", "849VQH00+", "849VQJ00+",
+    "849VPF00+", "849VPG00+", "849VPH00+", "849VPJ00+",
+]
+
+def returnAreas():
+    city = MergingTileArea([OpenGeoTile(code) for code in san_francisco_codes])
+    downtown = TileArea([OpenGeoTile("849VQHH2+"), OpenGeoTile("849VQHJ2+"), OpenGeoTile("849VQJJ2+")])
+    pier = TileArea(OpenGeoTile("849VRH22+X7"))
+    holed = MergingTileArea(OpenGeoTile("849VQH00+"))
+    holed.removeTile(OpenGeoTile("849VQHH2+"))
+    region = TileArea(OpenGeoTile("849V0000+"))
+    return {'city': city, 'downtown': downtown, 'pier': pier, 'holed': holed, ('region', 1): region}
+
+def test_lookups_match_TileAreas():
+    areas = returnAreas()
+    catalog = TileAreaCatalog(areas)
+    assert len(catalog) == 5 and 'pier' in catalog
+    assert catalog.getSmallestTileSize() == TileSize.PINPOINT
+    rng = np.random.default_rng(22)
+    lats = rng.uniform(37.55, 37.85, 3000)
+    longs = rng.uniform(-122.65, -122.25, 3000)
+    pier_center = olc.decode("849VRH22+X7")
+    lats[0], longs[0] = pier_center.latitudeCenter, pier_center.longitudeCenter
+    expected = [{area_id for area_id, area in areas.items() if area.containsLatLong(lat, long)}
+                for lat, long in zip(lats, longs)]
+    assert [catalog.getAreaIdsOfLatLong(lat, long) for lat, long in zip(lats, longs)] == expected
+    assert catalog.getAreaIdsOfLatLongs(lats, longs) == expected
+    assert 'pier' in expected[0]
+    point_indices, area_ids = catalog.returnPointAreaPairs(lats, longs)
+    assert (np.diff(point_indices) >= 0).all()
+    assert len(area_ids) == sum(len(area_ids) for area_ids in expected)
+
+    assert catalog.getAreaIdsOfTile(OpenGeoTile("849VQHH2+")) == {'city', 'downtown', ('region', 1)}
+    assert catalog.getAreaIdsOfTileAddress("849V") == {('region', 1)}
+    assert catalog.getAreaIdsOfTileAddress("84") == set()
+
+def test_incremental_changes():
+    areas = returnAreas()
+    catalog = TileAreaCatalog()
+    for area_id, area in areas.items():
+        catalog.addTileArea(area_id, area)
+    catalog.removeTileArea('pier')
+    assert catalog.getSmallestTileSize() == TileSize.NEIGHBORHOOD
+    assert catalog.getAreaIdsOfTileAddress("849VRH22X7") == {'city', ('region', 1)}
+    catalog.removeTileArea('city')
+    assert catalog.getAreaIdsOfTileAddress("849VQHH2") == {'downtown', ('region', 1)}
+    ''' replacing an area drops its old tiles '''
+    catalog.addTileArea('downtown', TileArea(OpenGeoTile("849VPF00+")))
+    assert catalog.getAreaIdsOfTileAddress("849VQHH2") == {('region', 1)}
+    assert catalog.getAreaIdsOfTileAddress("849VPF22") == {'downtown', ('region', 1)}
+    with pytest.raises(Exception):
+        catalog.removeTileArea('pier')
+    for area_id in list(catalog.getAreaIds()):
+        catalog.removeTileArea(area_id)
+    assert catalog.area_ids_by_address == {} and catalog.address_counts_by_code_length == {}
+    assert catalog.getAreaIdsOfLatLongs([37.7], [-122.4]) == [set()]
+
+def test_join_point_file(tmp_path):
+    catalog = TileAreaCatalog(returnAreas())
+    rng = np.random.default_rng(23)
+    points = np.column_stack([rng.uniform(37.55, 37.85, 2500), rng.uniform(-122.65, -122.25, 2500)])
+    npy_path = tmp_path / 'points.npy'
+    np.save(npy_path, points)
+    csv_path = tmp_path / 'points.csv'
+    with open(csv_path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['id', 'longitude', 'latitude'])
+        writer.writerows((i, repr(long), repr(lat)) for i, (lat, long) in enumerate(points.tolist()))
+
+    assert [len(lats) for first_index, lats, longs in iterate_point_chunks(csv_path, 1000)] == [1000, 1000, 500]
+    expected_rows = sorted([str(i), str(area_id)] for i, (lat, long) in enumerate(points.tolist())
+                           for area_id in catalog.getAreaIdsOfLatLong(lat, long))
+    outputs = []
+    for input_path in (npy_path, csv_path):
+        for max_workers in (None, 2):
+            output_path = tmp_path / 'joined.csv'
+            point_count, match_count = join_point_file(catalog, input_path, output_path,
+                                                       chunk_size=300, max_workers=max_workers)
+            assert point_count == 2500 and match_count == len(expected_rows)
+            with open(output_path, newline='') as output_file:
+                outputs.append(list(csv.reader(output_file)))
+    ''' serial and parallel output are identical, and the same for both formats '''
+    assert all(output == outputs[0] for output in outputs)
+    assert outputs[0][0] == ['point_index', 'area_id']
+    assert sorted(outputs[0][1:]) == expected_rows
+    assert [int(row[0]) for row in outputs[0][1:]] == sorted(int(row[0]) for row in outputs[0][1:])
+
+def test_nested_members_match_once():
+    nested = SimpleTileArea({OpenGeoTile("849VQH00+")})
+    nested.addNonContainedTile(OpenGeoTile("849VQHC2+"))
+    assert len(nested.tile_set) == 2
+    catalog = TileAreaCatalog({'s': nested})
+    center = olc.decode("849VQHC2+X2")
+    point_indices, area_ids = catalog.returnPointAreaPairs([center.latitudeCenter], [center.longitudeCenter])
+    assert point_indices.tolist() == [0] and area_ids == ['s']
+    assert catalog.getAreaIdsOfTileAddress("849VQHC2X2") == {'s'}
+    assert catalog.area_ids_by_address == {'849VQH': {'s'}}
+    catalog.removeTileArea('s')
+    assert catalog.area_ids_by_address == {}
+
+def test_join_point_file_with_nested_members(tmp_path):
+    nested = SimpleTileArea({OpenGeoTile("849VQH00+")})
+    nested.addNonContainedTile(OpenGeoTile("849VQHC2+"))
+    catalog = TileAreaCatalog({'nested': nested})
+    inner, outer = olc.decode("849VQHC2+X2"), olc.decode("849VQHX2+22")
+    npy_path = tmp_path / 'points.npy'
+    np.save(npy_path, np.array([[inner.latitudeCenter, inner.longitudeCenter],
+                                [outer.latitudeCenter, outer.longitudeCenter]]))
+    output_path = tmp_path / 'joined.csv'
+    assert join_point_file(catalog, npy_path, output_path) == (2, 2)
+    with open(output_path, newline='') as output_file:
+        assert list(csv.reader(output_file)) == [['point_index', 'area_id'], ['0', 'nested'], ['1', 'nested']]
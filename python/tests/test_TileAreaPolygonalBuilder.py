@@ -0,0 +1,116 @@
+from TileAreaPolygonalBuilder import TileAreaPolygonalBuilder
+from Coordinate import Coordinate
+from OpenGeoTile import OpenGeoTile, TileSize
+from openlocationcode import openlocationcode as olc
+
+def is_inside_polygon(lat, long, rings):
+    '''even-odd rule by casting a ray to the west'''
+    inside = False
+    for ring in rings:
+        for i in range(len(ring)):
+            (lat1, long1), (lat2, long2) = ring[i - 1], ring[i]
+            if (lat1 > lat) != (lat2 > lat):
+                if long1 + (lat - lat1) / (lat2 - lat1) * (long2 - long1) < long:
+                    inside = not inside
+    return inside
+
+def expected_tile_addresses(rings, tile_size, south, west, north, east):
+    '''all tiles of tile_size in the bounding box with their center inside the polygon'''
+    increment = tile_size.getCoordinateIncrement()
+    addresses = set()
+    for i in range(round((north - south) / increment)):
+        lat = south + (i + 0.5) * increment
+        for j in range(round((east - west) / increment)):
+            long = west + (j + 0.5) * increment
+            if is_inside_polygon(lat, long, rings):
+                addresses.add(olc.encode(lat, long, tile_size.getCodeLength()).replace('+', '')[:tile_size.getCodeLength()])
+    return addresses
+
+def returnAddressesAtSize(tile_area, tile_size):
+    return {subtile_address for tile in tile_area.tile_set
+            for subtile_address in tile.iterateSubtileAddresses(tile_size)}
+
+def test_NullPolygon():
+    ''' not setting a polygon results in None '''
+    assert TileAreaPolygonalBuilder().setPrecision(TileSize.NEIGHBORHOOD).build() is None
+
+def test_InvalidPolygon():
+    ''' setting an invalid polygon (only two valid vertices) results in None '''
+    coords = [Coordinate(0, 0), Coordinate(1.0, 1.0), Coordinate(500.0, 500.0)]
+    assert TileAreaPolygonalBuilder().setPrecision(TileSize.NEIGHBORHOOD).setCoordinatesList(coords).build() is None
+
+def test_ValidPolygonSquare():
+    coords = [Coordinate(0.0, 0.0), Coordinate(0.0, 1.0), Coordinate(1.0, 1.0), Coordinate(1.0, 0.0)]
+    testTileArea = TileAreaPolygonalBuilder().setPrecision(TileSize.DISTRICT).setCoordinatesList(coords).build()
+    assert testTileArea is not None
+    for lat, long in [(0.01, 0.01), (0.01, 0.99), (0.99, 0.99), (0.99, 0.01), (0.5, 0.5)]:
+        assert testTileArea.contains(OpenGeoTile(lat=lat, long=long, tile_size=TileSize.NEIGHBORHOOD))
+    assert {t.getTileAddress() for t in testTileArea.tile_set} == {"6FG2"}
+
+def test_ValidLargePolygon():
+    coords = [(0.0, 0.0), (0.0, 10.0), (10.0, 10.0), (10.0, 0.0)]
+    testTileArea = TileAreaPolygonalBuilder().setPrecision(TileSize.DISTRICT).setCoordinatesList(coords).build()
+    assert len(testTileArea.tile_set) == 100
+
+def test_ValidPolygonTriangle():
+    coords = [(0.25, 0.25), (0.25, 0.75), (0.75, 0.5)]
+    testTileArea = TileAreaPolygonalBuilder().setPrecision(TileSize.NEIGHBORHOOD).setCoordinatesList(coords).build()
+    assert testTileArea.contains(OpenGeoTile(lat=0.5, long=0.5, tile_size=TileSize.NEIGHBORHOOD))
+    assert returnAddressesAtSize(testTileArea, TileSize.NEIGHBORHOOD) == \
+        expected_tile_addresses([coords], TileSize.NEIGHBORHOOD, 0.2, 0.2, 0.8, 0.8)
+
+def test_PolygonWithHoleAndMultipolygon():
+    outer = [(37.7081, -122.5137), (37.7034, -122.3577), (37.8113, -122.3494), (37.8297, -122.4523), (37.7791, -122.5119)]
+    hole = [(37.7417, -122.4708), (37.7589, -122.4133), (37.7326, -122.4019)]
+    island = [(37.8511, -122.3027), (37.8706, -122.2514), (37.8442, -122.2621)]
+    testTileArea = TileAreaPolygonalBuilder() \
+        .setPrecision(TileSize.NEIGHBORHOOD) \
+        .setCoordinatesList(outer) \
+        .addCoordinatesList(hole) \
+        .addCoordinatesList(island) \
+        .build()
+    assert returnAddressesAtSize(testTileArea, TileSize.NEIGHBORHOOD) == \
+        expected_tile_addresses([outer, hole, island], TileSize.NEIGHBORHOOD, 37.6, -122.6, 37.9, -122.2)
+    assert not testTileArea.containsLatLong(37.745, -122.42)
+    assert testTileArea.containsLatLong(37.855, -122.27)
+
+def test_MaximumMerge():
+    coords = [(0.9, 0.9), (0.9, 2.1), (2.1, 2.1), (2.1, 0.9)]
+    ''' no maximum tile size, builds a TileArea with potentially GLOBAL-sized tiles '''
+    numTilesGlobal = len(TileAreaPolygonalBuilder().setPrecision(TileSize.DISTRICT)
+                         .setCoordinatesList(coords).build().tile_set)
+    numTilesRegion = len(TileAreaPolygonalBuilder().setPrecision(TileSize.DISTRICT)
+                         .setMaximumTileSize(TileSize.REGION).setCoordinatesList(coords).build().tile_set)
+    numTilesDistrict = len(TileAreaPolygonalBuilder().setPrecision(TileSize.DISTRICT)
+                           .setMaximumTileSize(TileSize.DISTRICT).setCoordinatesList(coords).build().tile_set)
+    ''' our area contains one full REGION but no full GLOBAL tile '''
+    assert numTilesGlobal == numTilesRegion
+    assert numTilesRegion + 399 == numTilesDistrict
+
+def test_SquarePolygonStartingPoint():
+    a, b, c, d = (0.0, 0.0), (0.1, 0.0), (0.1, 0.1), (0.0, 0.1)
+    testTileArea = TileAreaPolygonalBuilder().setPrecision(TileSize.NEIGHBORHOOD).setCoordinatesList([a, b, c, d]).build()
+    otherTileArea = TileAreaPolygonalBuilder().setPrecision(TileSize.NEIGHBORHOOD).setCoordinatesList([c, d, a, b]).build()
+    assert testTileArea.tile_set == otherTileArea.tile_set
+    assert returnAddressesAtSize(testTileArea, TileSize.NEIGHBORHOOD) == \
+        expected_tile_addresses([[a, b, c, d]], TileSize.NEIGHBORHOOD, -0.05, -0.05, 0.15, 0.15)
+
+def test_Coordinate():
+    coordinate = Coordinate(47.6, -122.3)
+    coordinate.setLatitude(47.7)
+    coordinate.setLongitude(-122.4)
+    assert (coordinate.latitude(), coordinate.longitude()) == (47.7, -122.4)
+
+def test_ParallelBuildMatchesSerial():
+    ''' covering the polygon in a process pool gives exactly the serial result '''
+    outer = [(47.0213, 8.0117), (47.4522, 8.2391), (47.5817, 8.9034), (47.2209, 9.3308), (46.8841, 8.7115)]
+    hole = [(47.1812, 8.4403), (47.3127, 8.5219), (47.2031, 8.6607)]
+    for split_tile_size, maximum_tile_size in ((TileSize.REGION, None), (TileSize.DISTRICT, TileSize.DISTRICT)):
+        builder = TileAreaPolygonalBuilder().setPrecision(TileSize.NEIGHBORHOOD) \
+            .setCoordinatesList(outer).addCoordinatesList(hole)
+        if maximum_tile_size is not None:
+            builder.setMaximumTileSize(maximum_tile_size)
+        serial_area = builder.build()
+        parallel_area = builder.setParallelism(2, split_tile_size).build()
+        assert {tile.getTileAddress() for tile in parallel_area.tile_set} == \
+               {tile.getTileAddress() for tile in serial_area.tile_set}
@@ -0,0 +1,100 @@
+from OpenGeoTile import OpenGeoTile, TileSize
+from openlocationcode import openlocationcode as olc
+import OpenGeoTile as ogt
+import TileArrays
+import numpy as np
+import pytest
+
+random_state = np.random.RandomState(20210831)
+random_lats = random_state.uniform(-90, 90, 500)
+random_longs = random_state.uniform(-180, 180, 500)
+edge_lats = np.array([90.0, -90.0, 0.0, 47.625, 37.767761, 89.9999999, -0.000125, 100.0, -95.0])
+edge_longs = np.array([180.0, -180.0, 0.0, -122.325, -122.441560, 179.9999999, 540.0, -190.0, 0.000125])
+
+def expected_address(lat, long, tile_size):
+    return OpenGeoTile(olc.encode(lat, long, tile_size.getCodeLength()), tile_size).getTileAddress()
+
+def test_encode_tiles_matches_OpenGeoTile():
+    lats = np.concatenate([random_lats, edge_lats])
+    longs = np.concatenate([random_longs, edge_longs])
+    for tile_size in TileSize:
+        addresses = TileArrays.encode_tiles(lats, longs, tile_size)
+        assert addresses.shape == lats.shape
+        assert list(addresses) == [expected_address(lat, long, tile_size) for lat, long in zip(lats, longs)]
+
+def test_encode_tiles_to_tile_ids():
+    tile_ids = TileArrays.encode_tiles(random_lats, random_longs, TileSize.NEIGHBORHOOD, return_tile_ids=True)
+    assert tile_ids.dtype == np.int64
+    addresses = TileArrays.encode_tiles(random_lats, random_longs, TileSize.NEIGHBORHOOD)
+    assert [ogt.return_address_of_tile_id(int(tile_id)) for tile_id in tile_ids] == list(addresses)
+    assert list(TileArrays.return_address_array_of_tile_ids(tile_ids, TileSize.NEIGHBORHOOD)) == list(addresses)
+
+def test_encode_tiles_keeps_shape():
+    lats = random_lats[:12].reshape(3, 4)
+    longs = random_longs[:12].reshape(3, 4)
+    addresses = TileArrays.encode_tiles(lats, longs, TileSize.DISTRICT)
+    assert addresses.shape == (3, 4)
+    assert addresses[1, 2] == expected_address(lats[1, 2], longs[1, 2], TileSize.DISTRICT)
+
+def test_encode_tiles_invalid_input():
+    with pytest.raises(Exception):
+        TileArrays.encode_tiles([1.0, 2.0], [1.0])
+    with pytest.raises(Exception):
+        TileArrays.encode_tiles([np.nan], [1.0])
+
+def test_tile_ids_of_addresses():
+    addresses = ['84', '84VV', '84VVJM', '84vvjm55', '84VVJM558V', 'CV', '22']
+    tile_ids = TileArrays.return_tile_id_array_of_addresses(addresses)
+    assert list(tile_ids) == [ogt.return_tile_id_of_address(address) for address in addresses]
+    for invalid_addresses in [['84V'], ['84AA'], ['84VVJM558V22'], ['']]:
+        with pytest.raises(Exception):
+            TileArrays.return_tile_id_array_of_addresses(invalid_addresses)
+
+def test_decode_tiles_matches_olc():
+    lats = np.concatenate([random_lats, edge_lats])
+    longs = np.concatenate([random_longs, edge_longs])
+    addresses = np.concatenate([TileArrays.encode_tiles(lats, longs, tile_size) for tile_size in TileSize])
+    bounds = TileArrays.decode_tiles(addresses)
+    tile_id_bounds = TileArrays.decode_tiles(TileArrays.return_tile_id_array_of_addresses(addresses))
+    for index, address in enumerate(addresses):
+        code_area = olc.decode(ogt.return_code_of_tile_address(address))
+        assert bounds.south[index] == pytest.approx(code_area.latitudeLo, abs=1e-9)
+        assert bounds.west[index] == pytest.approx(code_area.longitudeLo, abs=1e-9)
+        assert bounds.north[index] == pytest.approx(code_area.latitudeHi, abs=1e-9)
+        assert bounds.east[index] == pytest.approx(code_area.longitudeHi, abs=1e-9)
+        assert bounds.latitude_center[index] == pytest.approx(code_area.latitudeCenter, abs=1e-9)
+        assert bounds.longitude_center[index] == pytest.approx(code_area.longitudeCenter, abs=1e-9)
+    for field_index in range(len(bounds)):
+        assert np.array_equal(bounds[field_index], tile_id_bounds[field_index])
+
+def test_grid_coordinates_of_tile_ids():
+    addresses = ['8CRW2X', '22', 'CV', 'CVXXXXXXXX']
+    rows, columns, levels = TileArrays.return_grid_coordinate_arrays_of_tile_ids(
+        TileArrays.return_tile_id_array_of_addresses(addresses))
+    for index, address in enumerate(addresses):
+        assert (rows[index], columns[index]) == OpenGeoTile(address).getGridCoordinates()
+        assert levels[index] * 2 == len(address)
+
+def test_ring_and_disk_tile_ids_match_OpenGeoTile():
+    for address in ["8CRW2X", "8VXX", "CFX2", "2F22", "8V", "9F53XXXXXX"]:
+        tile = OpenGeoTile(address)
+        for manhattan in [False, True]:
+            for distance in [0, 1, 3, 12]:
+                expected_disk = [ogt.return_tile_id_of_address(a) for a in tile.iterateDiskAddresses(distance, manhattan)]
+                expected_ring = [ogt.return_tile_id_of_address(a) for a in tile.iterateRingAddresses(distance, manhattan)]
+                assert TileArrays.return_disk_tile_id_array(tile, distance, manhattan).tolist() == expected_disk
+                assert TileArrays.return_ring_tile_id_array(address, distance, manhattan).tolist() == expected_ring
+    assert TileArrays.return_disk_tile_id_array("8CRW2X", 50).size == 101 * 101
+
+def test_prefix_tile_ids_and_contained_mask():
+    tile_ids = TileArrays.encode_tiles(random_lats, random_longs, TileSize.PINPOINT, return_tile_ids=True)
+    addresses = TileArrays.encode_tiles(random_lats, random_longs, TileSize.PINPOINT)
+    for tile_size in TileSize:
+        prefix_ids = TileArrays.return_prefix_tile_id_array(tile_ids, tile_size)
+        assert prefix_ids.tolist() == [ogt.return_tile_id_of_address(address[:tile_size.getCodeLength()])
+                                       for address in addresses]
+    members = {TileSize.REGION: np.sort(TileArrays.return_tile_id_array_of_addresses(['9C3W', '2X2X'])),
+               TileSize.DISTRICT: TileArrays.return_tile_id_array_of_addresses([addresses[0][:6]])}
+    mask = TileArrays.return_contained_mask(tile_ids, members)
+    assert mask.tolist() == [address[:4] in ('9C3W', '2X2X') or address[:6] == addresses[0][:6]
+                             for address in addresses]
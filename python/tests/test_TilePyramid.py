@@ -0,0 +1,68 @@
+from TilePyramid import TilePyramid
+from OpenGeoTile import TileSize
+import TileArrays
+import numpy as np
+import pytest
+
+def expected_statistics(addresses, weights, tile_size):
+    '''rolls up weights per finest tile by hand, keyed on address prefixes'''
+    finest = {}
+    for address, weight in zip(addresses, weights):
+        finest[address] = finest.get(address, 0.0) + weight
+    statistics = {}
+    for address, weight in finest.items():
+        prefix = address[:tile_size.getCodeLength()]
+        total, smallest, biggest = statistics.get(prefix, (0.0, weight, weight))
+        statistics[prefix] = (total + weight, min(smallest, weight), max(biggest, weight))
+    return statistics
+
+def as_dict(statistics):
+    return {address: (total, smallest, biggest)
+            for address, total, smallest, biggest in zip(statistics.tile_ids.tolist(), statistics.sums.tolist(),
+                                                        statistics.mins.tolist(), statistics.maxs.tolist())}
+
+def test_rollups_match_dict_aggregation():
+    rng = np.random.default_rng(25)
+    pyramid = TilePyramid(TileSize.NEIGHBORHOOD)
+    all_addresses = []
+    all_weights = []
+    for batch in range(4):
+        lats = rng.normal(47.6, 0.3, 3000)
+        longs = rng.normal(-122.3, 0.3, 3000)
+        weights = rng.integers(1, 5, 3000).astype(float)
+        pyramid.addLatLongs(lats, longs, weights)
+        all_addresses += TileArrays.encode_tiles(lats, longs, TileSize.NEIGHBORHOOD).tolist()
+        all_weights += weights.tolist()
+        ''' sizes rolled up in earlier batches are updated incrementally, the others from scratch '''
+        for tile_size in [TileSize.GLOBAL, TileSize.REGION, TileSize.DISTRICT, TileSize.NEIGHBORHOOD][batch % 2:]:
+            assert as_dict(pyramid.returnAddressStatistics(tile_size)) == \
+                   expected_statistics(all_addresses, all_weights, tile_size)
+    statistics = pyramid.returnStatistics(TileSize.DISTRICT)
+    assert (np.diff(statistics.tile_ids) > 0).all()
+    assert pyramid.getTotalWeight() == sum(all_weights)
+    assert pyramid.getWeightOfTileAddress(all_addresses[0][:4]) == \
+           sum(weight for address, weight in zip(all_addresses, all_weights) if address.startswith(all_addresses[0][:4]))
+
+def test_addTiles():
+    pyramid = TilePyramid(TileSize.DISTRICT)
+    assert pyramid.returnStatistics(TileSize.REGION).sums.tolist() == []
+    pyramid.addTiles(['849VQHC2X2', '849VQH', '849VQJ22'], [1.5, 2.0, 4.0])
+    pyramid.addTiles(np.array(['849VQHXX']))
+    assert as_dict(pyramid.returnAddressStatistics()) == {'849VQH': (4.5, 4.5, 4.5), '849VQJ': (4.0, 4.0, 4.0)}
+    assert as_dict(pyramid.returnAddressStatistics(TileSize.REGION)) == {'849V': (8.5, 4.0, 4.5)}
+    pyramid.addTiles(TileArrays.return_tile_id_array_of_addresses(['849WQH']), [-1.0])
+    assert as_dict(pyramid.returnAddressStatistics(TileSize.GLOBAL)) == {'84': (7.5, -1.0, 4.5)}
+    assert pyramid.getWeightOfTileAddress('849VQH') == 4.5
+    assert pyramid.getWeightOfTileAddress('C9') == 0.0
+    with pytest.raises(Exception):
+        pyramid.addTiles(['849V'])
+    with pytest.raises(Exception):
+        pyramid.addTiles(['849VQH'], [1.0, 2.0])
+    ''' level bits beyond PINPOINT '''
+    valid_tile_id = TileArrays.return_tile_id_array_of_addresses(['849VQHC2X2'])[0]
+    for invalid_level in (6, 7):
+        with pytest.raises(Exception):
+            pyramid.addTileIds([(valid_tile_id & ~7) | invalid_level])
+    assert pyramid.getTotalWeight() == 7.5
+    with pytest.raises(Exception):
+        pyramid.returnStatistics(TileSize.PINPOINT)
@@ -1,3 +1,4 @@
+import pytest
 import OpenGeoTile as ogt
 
 originalBlock = ogt.OpenGeoTile("8CRW2X")
@@ -48,3 +49,100 @@ def test_NonAdjacencySelf():
     assert not originalBlock.isNeighbor(originalBlock)
     assert not polarBlock.isNeighbor(polarBlock)
 
+
+def test_NeighborAddressesMatchOpenLocationCode():
+    '''neighbor addresses computed on the address digits match neighbors found by re-encoding
+       the tile center shifted by one tile size, including wrapping and clipping'''
+    from openlocationcode import openlocationcode as olc
+    addresses = ["8CRW2X", "8V", "72", "CF", "22", "2VXX", "CCXWXWXW", "CVXXXXXXXX", "222222X222", "9F53XXXXXX"]
+    for address in addresses:
+        tile = ogt.OpenGeoTile(address)
+        code_area = olc.decode(tile.getTileOpenLocationCode())
+        delta = tile.getTileSize().getCoordinateIncrement()
+        expected_addresses = set()
+        for direction, (lat_diff, long_diff) in ogt.EIGHT_POINT_DIRECTION_DELTAS.items():
+            neighbor = ogt.OpenGeoTile(olc.encode(code_area.latitudeCenter + delta * lat_diff,
+                                                  code_area.longitudeCenter + delta * long_diff,
+                                                  tile.getTileSize().getCodeLength()),
+                                       tile.getTileSize())
+            if not neighbor.isSameTile(tile):
+                expected_addresses.add(neighbor.getTileAddress())
+            assert tile.getNeighborAddresses(direction) <= {neighbor.getTileAddress()}
+        assert tile.getNeighborAddresses() == expected_addresses
+        assert {t.getTileAddress() for t in tile.getNeighbors()} == expected_addresses
+
+def test_NeighborAddressesWrapping():
+    assert ogt.OpenGeoTile("8V").getNeighborAddresses("E") == {"82"}
+    assert ogt.OpenGeoTile("82").getNeighborAddresses("W") == {"8V"}
+    assert ogt.OpenGeoTile("8VXX").getNeighborAddresses("NE") == {"9222"}
+    assert ogt.OpenGeoTile("CF").getNeighborAddresses(["N", "NE", "NW"]) == set()
+    assert ogt.OpenGeoTile("2F22").getNeighborAddresses("S") == set()
+
+def test_AdjacencyMatchesNeighborEnumeration():
+    '''adjacency on grid coordinates agrees with checking all neighbors of the smaller tile'''
+    def enumerated_is_neighbor(tile, other_tile):
+        if tile.getTileSize().getCodeLength() > other_tile.getTileSize().getCodeLength():
+            tile, other_tile = other_tile, tile
+        if tile.contains(other_tile) or other_tile.contains(tile):
+            return False
+        return any(tile.contains(neighbor) for neighbor in other_tile.getNeighbors())
+
+    addresses = ["8CRW2X", "8CRW", "8CRX", "8CQX", "8CRW2W8X", "8CRW3X22", "8CRX22", "8CRX2222",
+                 "8CRW2XXX", "8V", "82", "8VXX", "822X", "9222", "8VX2X2", "CF", "CFX2", "9FX2"]
+    tiles = [ogt.OpenGeoTile(address) for address in addresses]
+    for tile in tiles:
+        for other_tile in tiles:
+            assert tile.isNeighbor(other_tile) == enumerated_is_neighbor(tile, other_tile), \
+                (tile.getTileAddress(), other_tile.getTileAddress())
+
+def test_EightPointDirectionWrapping():
+    pacificLeft = ogt.OpenGeoTile("8V")
+    pacificRight = ogt.OpenGeoTile("72")
+    assert pacificLeft.getEightPointDirectionOfNeighbor(pacificRight) == "SE"
+    assert pacificRight.getEightPointDirectionOfNeighbor(pacificLeft) == "NW"
+    assert originalBlock.getEightPointDirectionOfNeighbor(ogt.OpenGeoTile("8CQXX2")) == "SE"
+
+def test_GridCoordinates():
+    assert ogt.OpenGeoTile("22").getGridCoordinates() == (0, 0)
+    assert ogt.OpenGeoTile("CV").getGridCoordinates() == (8, 17)
+    assert ogt.OpenGeoTile("8CRW2X").getGridCoordinates() == (6 * 400 + 16 * 20 + 0, 8 * 400 + 18 * 20 + 19)
+    for address in ["8CRW2X", "CVXXXXXXXX", "2222", "9F53XXXXXX"]:
+        tile = ogt.OpenGeoTile(address)
+        row, column = tile.getGridCoordinates()
+        assert ogt.return_address_of_grid_coordinates(row, column, tile.getTileSize()) == address
+
+def test_RingsAndDisks():
+    def expanded_disk_addresses(tile, distance, manhattan):
+        '''tiles within distance, found by repeatedly expanding the set of neighbors'''
+        directions = ["N", "E", "S", "W"] if manhattan else None
+        addresses = {tile.getTileAddress()}
+        for i in range(distance):
+            addresses |= {neighbor for address in addresses
+                          for neighbor in ogt.OpenGeoTile(address).getNeighborAddresses(directions)}
+        return addresses
+
+    for address in ["8CRW2X", "8VXX", "CFX2", "2F22", "9222", "8V"]:
+        tile = ogt.OpenGeoTile(address)
+        for manhattan in [False, True]:
+            assert set(tile.iterateRingAddresses(1, manhattan)) == \
+                tile.getNeighborAddresses(["N", "E", "S", "W"] if manhattan else None)
+            previous_disk = set()
+            for distance in range(4):
+                disk = list(tile.iterateDiskAddresses(distance, manhattan))
+                assert len(disk) == len(set(disk))
+                assert set(disk) == expanded_disk_addresses(tile, distance, manhattan)
+                ring = list(tile.iterateRingAddresses(distance, manhattan))
+                assert set(ring) == set(disk) - previous_disk
+                previous_disk = set(disk)
+
+def test_DisksWrapAroundTheGlobe():
+    tile = ogt.OpenGeoTile("8V")
+    disk = list(tile.iterateDiskAddresses(12))
+    assert len(disk) == len(set(disk)) == 9 * 18
+    '''the column on the opposite side of the globe is 9 columns away in both directions'''
+    assert list(tile.iterateRingAddresses(9)) == [row + "C" for row in "23456789C"]
+    assert list(tile.iterateRingAddresses(10)) == []
+    assert set(ogt.OpenGeoTile("CFXX").iterateRingAddresses(2)) == \
+        {"CFVV", "CFVW", "CFVX", "CGV2", "CGV3", "CFWV", "CGW3", "CFXV", "CGX3"}
+    with pytest.raises(Exception):
+        list(tile.iterateDiskAddresses(-1))
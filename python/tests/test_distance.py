@@ -1,3 +1,4 @@
+import pytest
 import OpenGeoTile as ogt
 
 def test_DistancesSimpleRegion():
@@ -58,3 +59,29 @@ def test_DistancesWrapWestEast():
     assert tile1.getManhattanTileDistanceTo(tile2)==tile2.getManhattanTileDistanceTo(tile1)
     assert 7*20+1+1 == tile1.getManhattanTileDistanceTo(tile2)
     assert 7*20+1 == tile1.getChebyshevTileDistanceTo(tile2)
+
+def test_DistanceMatrices():
+    import TileArrays
+    addresses = ["9F53", "8FXG", "9C22", "8VX3", "9622", "9H22", "82X3", "C2X2", "2VX3"]
+    tiles = [ogt.OpenGeoTile(address) for address in addresses]
+    manhattan = TileArrays.manhattan_tile_distances(addresses)
+    chebyshev = TileArrays.chebyshev_tile_distances(addresses)
+    directions = TileArrays.tile_directions(addresses)
+    assert manhattan.shape == (len(addresses), len(addresses))
+    for i, tile in enumerate(tiles):
+        for j, other_tile in enumerate(tiles):
+            assert manhattan[i, j] == tile.getManhattanTileDistanceTo(other_tile)
+            assert chebyshev[i, j] == tile.getChebyshevTileDistanceTo(other_tile)
+            assert directions[i, j] == pytest.approx(tile.getDirection(other_tile))
+
+    pinpoint_addresses = ["9F53XXXXXX", "8FXGXXXXXX", "8VX32222X2"]
+    tile_ids = TileArrays.return_tile_id_array_of_addresses(pinpoint_addresses[1:])
+    manhattan = TileArrays.manhattan_tile_distances(pinpoint_addresses[:1], tile_ids)
+    assert manhattan.shape == (1, 2)
+    for j, address in enumerate(pinpoint_addresses[1:]):
+        assert manhattan[0, j] == ogt.OpenGeoTile(pinpoint_addresses[0]).getManhattanTileDistanceTo(ogt.OpenGeoTile(address))
+
+    with pytest.raises(Exception):
+        TileArrays.manhattan_tile_distances(["9F53", "9F53XX"])
+    with pytest.raises(Exception):
+        TileArrays.chebyshev_tile_distances(["9F53"], ["9F53XX"])
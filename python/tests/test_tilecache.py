@@ -0,0 +1,60 @@
+import OpenGeoTile as ogt
+from OpenGeoTile import OpenGeoTile, OpenGeoTileCache, TileSize
+import pytest
+
+@pytest.fixture
+def tile_cache():
+    cache = ogt.enable_tile_cache(max_size=4)
+    yield cache
+    ogt.disable_tile_cache()
+
+def test_cache_disabled_by_default():
+    assert ogt.get_tile_cache() is None
+    assert ogt.return_tile_of_address('84VV') is not ogt.return_tile_of_address('84VV')
+
+def test_cache_returns_shared_tiles(tile_cache):
+    peuget_sound = ogt.return_tile_of_address('84VV')
+    assert ogt.return_tile_of_address('84vv') is peuget_sound
+    assert peuget_sound == OpenGeoTile('84VV0000+')
+    assert ogt.return_tile_of_lat_long(47.625, -122.325, TileSize.REGION) is peuget_sound
+    assert tile_cache.getStats() == {"hits": 2, "misses": 1, "size": 1, "max_size": 4}
+
+def test_cache_is_bounded(tile_cache):
+    addresses = ['84', '85', '86', '87', '88']
+    first_tile = ogt.return_tile_of_address(addresses[0])
+    for address in addresses[1:]:
+        ogt.return_tile_of_address(address)
+    assert tile_cache.getStats()["size"] == 4
+    ''' least recently used tile was evicted '''
+    assert ogt.return_tile_of_address(addresses[0]) is not first_tile
+    assert tile_cache.getStats()["misses"] == 6
+
+def test_cached_tiles_are_read_only(tile_cache):
+    peuget_sound = ogt.return_tile_of_address('84VV')
+    with pytest.raises(AttributeError):
+        peuget_sound.tile_address = 'XXXX'
+    with pytest.raises(AttributeError):
+        peuget_sound.tile_size = TileSize.GLOBAL
+    assert peuget_sound.getGridCoordinates() == ogt.return_grid_coordinates_of_address('84VV')
+    assert ogt.return_tile_of_address('84VV').getTileAddress() == '84VV'
+    ''' tiles constructed directly stay modifiable '''
+    uncached_tile = OpenGeoTile('84VV0000+')
+    uncached_tile.tile_address = '84VW'
+    assert uncached_tile.tile_address == '84VW'
+
+def test_neighbors_use_cache():
+    tile_cache = ogt.enable_tile_cache(max_size=16)
+    try:
+        seattle = OpenGeoTile('84VVJM')
+        first_neighbors = seattle.getNeighbors()
+        second_neighbors = seattle.getNeighbors()
+        assert all(any(tile is other_tile for other_tile in second_neighbors) for tile in first_neighbors)
+        assert tile_cache.getStats() == {"hits": 8, "misses": 8, "size": 8, "max_size": 16}
+        tile_cache.clear()
+        assert tile_cache.getStats() == {"hits": 0, "misses": 0, "size": 0, "max_size": 16}
+    finally:
+        ogt.disable_tile_cache()
+
+def test_invalid_cache_size():
+    with pytest.raises(Exception):
+        OpenGeoTileCache(0)